@@ -0,0 +1,132 @@
+import json
+import logging
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+
+from job_manifest import file_checksum
+
+# Version du format des chapitres : à incrémenter quand l'analyse change de résultat
+ANALYSIS_VERSION = 2
+# Nombre de livres analysés gardés en mémoire
+DEFAULT_MAX_ENTRIES = 4
+# Taille maximale par défaut du cache disque (256 Mo)
+DEFAULT_DISK_SIZE = 256 * 1024 * 1024
+
+
+class AnalysisCache:
+    """Cache des chapitres extraits d'un livre, pour ne l'analyser qu'une fois.
+
+    Une entrée est identifiée par le type d'analyse et le sha256 du fichier. Le
+    hash n'est recalculé que si le chemin, la taille ou la date de modification
+    changent. Les entrées sont gardées en mémoire (LRU de `max_entries` livres)
+    et, si `cache_dir` est fourni, sérialisées en JSON sur disque.
+
+    Les listes renvoyées sont partagées : les appelants ne doivent pas les modifier.
+    """
+
+    def __init__(self, cache_dir=None, max_entries=DEFAULT_MAX_ENTRIES, max_bytes=DEFAULT_DISK_SIZE):
+        self.cache_dir = str(cache_dir) if cache_dir else None
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        self.entries = OrderedDict()
+        # (chemin, taille, date de modification) -> sha256 du fichier
+        self.checksums = {}
+        if self.cache_dir:
+            os.makedirs(self.cache_dir, exist_ok=True)
+
+    def make_key(self, file_path, kind):
+        """Calcule la clé d'un fichier, en réutilisant son hash s'il n'a pas changé."""
+        path = os.path.abspath(file_path)
+        stat = os.stat(path)
+        fingerprint = (path, stat.st_size, stat.st_mtime_ns)
+        with self.lock:
+            checksum = self.checksums.get(fingerprint)
+        if checksum is None:
+            checksum = file_checksum(path)
+            with self.lock:
+                self.checksums[fingerprint] = checksum
+        return f'{kind}-v{ANALYSIS_VERSION}-{checksum}'
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, key + '.json')
+
+    def get(self, key):
+        """Renvoie les chapitres de `key`, depuis la mémoire puis le disque (None si absents)."""
+        with self.lock:
+            if key in self.entries:
+                self.entries.move_to_end(key)
+                return self.entries[key]
+
+        if not self.cache_dir:
+            return None
+        path = self._path(key)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                chapters = json.load(f)
+            os.utime(path)  # Marque l'entrée comme récemment utilisée
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logging.warning(f"Entrée d'analyse illisible {path}: {e}")
+            return None
+
+        self._remember(key, chapters)
+        return chapters
+
+    def put(self, key, chapters):
+        """Enregistre les chapitres de `key` en mémoire et, si possible, sur disque."""
+        self._remember(key, chapters)
+        if not self.cache_dir:
+            return
+
+        fd, temp_path = tempfile.mkstemp(dir=self.cache_dir, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(chapters, f, ensure_ascii=False)
+            os.replace(temp_path, self._path(key))
+        except OSError as e:
+            logging.error(f"Erreur d'écriture du cache d'analyse {key}: {e}")
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            return
+        self.evict()
+
+    def _remember(self, key, chapters):
+        with self.lock:
+            self.entries[key] = chapters
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+    def evict(self):
+        """Supprime les entrées disque les plus anciennes au-delà de `max_bytes`."""
+        entries = []
+        for entry in os.scandir(self.cache_dir):
+            if entry.is_file() and entry.name.endswith('.json'):
+                stat = entry.stat()
+                entries.append((entry.path, stat.st_size, stat.st_mtime))
+        entries.sort(key=lambda entry: entry[2])
+        total_bytes = sum(size for _, size, _ in entries)
+        for path, size, _ in entries:
+            if total_bytes <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+                total_bytes -= size
+            except OSError as e:
+                logging.error(f"Impossible de supprimer l'entrée d'analyse {path}: {e}")
+
+    def get_or_analyze(self, file_path, kind, analyze):
+        """Renvoie les chapitres en cache, ou appelle `analyze(file_path)` et les mémorise."""
+        key = self.make_key(file_path, kind)
+        chapters = self.get(key)
+        if chapters is None:
+            chapters = analyze(file_path)
+            self.put(key, chapters)
+        return chapters
+
+
+__all__ = ['AnalysisCache', 'ANALYSIS_VERSION']
@@ -0,0 +1,187 @@
+import asyncio
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+# aiohttp n'est importé qu'à la création du connecteur partagé (démarrage plus rapide)
+_shared_connector_class = None
+# Éléments produits par un thread et pas encore consommés par la boucle (voir iterate_in_thread)
+DEFAULT_PIPELINE_SIZE = 4
+# Threads réservés aux fichiers audio (voir run_io)
+IO_WORKERS = 4
+_io_executor = None
+_io_executor_lock = threading.Lock()
+
+
+def get_shared_connector_class():
+    """Crée (une seule fois) la classe `SharedConnector`, dérivée de `aiohttp.TCPConnector`."""
+    global _shared_connector_class
+    if _shared_connector_class is None:
+        import aiohttp
+
+        class SharedConnector(aiohttp.TCPConnector):
+            """Connecteur aiohttp partagé entre les sessions.
+
+            edge-tts ouvre une `ClientSession` par requête et la ferme ensuite : la
+            fermeture est donc ignorée ici pour conserver le pool (cache DNS, contexte TLS,
+            connexions keep-alive). `shutdown()` ferme réellement le connecteur.
+            """
+
+            async def close(self):
+                pass
+
+            async def shutdown(self):
+                result = super().close()
+                if asyncio.iscoroutine(result) or isinstance(result, asyncio.Future):
+                    await result
+
+        _shared_connector_class = SharedConnector
+    return _shared_connector_class
+
+
+def get_io_executor():
+    """Pool de threads borné réservé aux fichiers audio : écriture en flux,
+    assemblage des chapitres, sommes de contrôle, cache et manifeste.
+
+    Ces tâches sont courtes et ne dépendent d'aucune autre : distinctes du pool
+    par défaut de la boucle, elles avancent quoi qu'il y attende.
+    """
+    global _io_executor
+    with _io_executor_lock:
+        if _io_executor is None:
+            _io_executor = ThreadPoolExecutor(max_workers=IO_WORKERS, thread_name_prefix='audio-io')
+        return _io_executor
+
+
+async def run_io(func, *args):
+    """Exécute `func(*args)` sur le pool des fichiers audio (voir get_io_executor)."""
+    return await asyncio.get_running_loop().run_in_executor(get_io_executor(), func, *args)
+
+
+async def iterate_in_thread(make_iterator, maxsize=DEFAULT_PIPELINE_SIZE):
+    """Parcourt l'itérateur bloquant `make_iterator()` dans un thread et produit ses
+    éléments dans la boucle, au fil de l'eau.
+
+    Au plus `maxsize` éléments attendent d'être consommés : au-delà, le thread
+    producteur est suspendu. Ce thread lui est dédié : un producteur en attente
+    n'occupe aucun thread des pools dont dépend la consommation. Une exception du producteur est relancée chez le
+    consommateur ; si celui-ci s'arrête, le producteur s'interrompt à l'élément suivant.
+    """
+    loop = asyncio.get_running_loop()
+    items = asyncio.Queue()
+    slots = threading.BoundedSemaphore(maxsize)
+    stopped = threading.Event()
+
+    def produce():
+        try:
+            for item in make_iterator():
+                while not slots.acquire(timeout=0.1):
+                    if stopped.is_set():
+                        return
+                if stopped.is_set():
+                    return
+                loop.call_soon_threadsafe(items.put_nowait, (False, item))
+            loop.call_soon_threadsafe(items.put_nowait, (True, None))
+        except Exception as e:
+            if not loop.is_closed():
+                loop.call_soon_threadsafe(items.put_nowait, (True, e))
+
+    threading.Thread(target=produce, name='iterate-in-thread', daemon=True).start()
+    try:
+        while True:
+            finished, value = await items.get()
+            if finished:
+                if value is not None:
+                    raise value
+                return
+            slots.release()
+            yield value
+    finally:
+        stopped.set()
+
+
+class AsyncRuntime:
+    """Boucle asyncio unique, exécutée dans un thread d'arrière-plan.
+
+    Les appels venant du pont JS de pywebview (un thread par appel) y soumettent
+    leurs coroutines avec `submit`/`run`, au lieu de créer une boucle à chaque fois.
+    """
+
+    def __init__(self, name='asyncio-runtime', connector_limit=32):
+        self.name = name
+        self.connector_limit = connector_limit
+        self.loop = None
+        self.thread = None
+        self.connector = None
+        self.lock = threading.Lock()
+
+    def start(self):
+        """Démarre la boucle si nécessaire (appelé automatiquement par `submit`)."""
+        with self.lock:
+            if self.thread and self.thread.is_alive():
+                return self.loop
+
+            self.loop = asyncio.new_event_loop()
+            ready = threading.Event()
+
+            def run_loop():
+                asyncio.set_event_loop(self.loop)
+                self.loop.call_soon(ready.set)
+                self.loop.run_forever()
+
+            self.thread = threading.Thread(target=run_loop, name=self.name, daemon=True)
+            self.thread.start()
+            ready.wait()
+            return self.loop
+
+    def in_runtime_thread(self):
+        return self.thread is not None and threading.current_thread() is self.thread
+
+    def submit(self, coro):
+        """Soumet une coroutine depuis n'importe quel thread ; renvoie un
+        `concurrent.futures.Future`."""
+        loop = self.start()
+        return asyncio.run_coroutine_threadsafe(coro, loop)
+
+    def run(self, coro, timeout=None):
+        """Exécute une coroutine dans la boucle partagée et attend son résultat."""
+        if self.in_runtime_thread():
+            coro.close()
+            raise RuntimeError("run() ne peut pas être appelé depuis la boucle partagée, utilisez await")
+        return self.submit(coro).result(timeout)
+
+    def get_connector(self):
+        """Renvoie le connecteur partagé, ou None hors de la boucle partagée
+        (aiohttp exige que le connecteur et la session partagent la même boucle)."""
+        try:
+            running_loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return None
+        if running_loop is not self.loop:
+            return None
+        if self.connector is None or self.connector.closed:
+            self.connector = get_shared_connector_class()(limit=self.connector_limit, ttl_dns_cache=300)
+        return self.connector
+
+    def stop(self, timeout=5):
+        """Ferme le connecteur partagé et arrête la boucle."""
+        with self.lock:
+            if not (self.thread and self.thread.is_alive()):
+                return
+
+            async def shutdown():
+                if self.connector is not None:
+                    await self.connector.shutdown()
+                    self.connector = None
+
+            try:
+                asyncio.run_coroutine_threadsafe(shutdown(), self.loop).result(timeout)
+            except Exception as e:
+                logging.warning(f"Erreur lors de la fermeture du connecteur partagé: {e}")
+            self.loop.call_soon_threadsafe(self.loop.stop)
+            self.thread.join(timeout)
+            self.loop.close()
+            self.thread = None
+
+
+__all__ = ['AsyncRuntime', 'get_shared_connector_class', 'iterate_in_thread', 'get_io_executor', 'run_io']
@@ -0,0 +1,225 @@
+import logging
+import os
+import struct
+import tempfile
+
+# Taille des blocs lus dans les fichiers MP3
+BLOCK_SIZE = 64 * 1024
+# Nombre maximal d'entrées d'une table des matières ID3 (champ sur un octet)
+MAX_TOC_ENTRIES = 255
+
+# Débits (kbit/s) par version MPEG et couche, indexés par le champ bitrate de l'en-tête
+BITRATES = {
+    (1, 1): (0, 32, 64, 96, 128, 160, 192, 224, 256, 288, 320, 352, 384, 416, 448),
+    (1, 2): (0, 32, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320, 384),
+    (1, 3): (0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320),
+    (2, 1): (0, 32, 48, 56, 64, 80, 96, 112, 128, 144, 160, 176, 192, 224, 256),
+    (2, 2): (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160),
+    (2, 3): (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160),
+}
+SAMPLE_RATES = {1: (44100, 48000, 32000), 2: (22050, 24000, 16000), 2.5: (11025, 12000, 8000)}
+VERSIONS = {0: 2.5, 2: 2, 3: 1}
+LAYERS = {1: 3, 2: 2, 3: 1}
+
+
+def parse_frame_header(header):
+    """Décode un en-tête de trame MPEG audio (4 octets).
+
+    Renvoie `(taille de la trame, échantillons, fréquence)` ou None si ce n'est
+    pas un en-tête valide.
+    """
+    if len(header) < 4 or header[0] != 0xFF or header[1] & 0xE0 != 0xE0:
+        return None
+    version = VERSIONS.get((header[1] >> 3) & 0x03)
+    layer = LAYERS.get((header[1] >> 1) & 0x03)
+    bitrate_index = header[2] >> 4
+    sample_rate_index = (header[2] >> 2) & 0x03
+    if version is None or layer is None or bitrate_index in (0, 15) or sample_rate_index == 3:
+        return None
+
+    bitrate = BITRATES[(1 if version == 1 else 2, layer)][bitrate_index] * 1000
+    sample_rate = SAMPLE_RATES[version][sample_rate_index]
+    padding = (header[2] >> 1) & 0x01
+    if layer == 1:
+        return (12 * bitrate // sample_rate + padding) * 4, 384, sample_rate
+    samples = 576 if layer == 3 and version != 1 else 1152
+    return samples // 8 * bitrate // sample_rate + padding, samples, sample_rate
+
+
+def is_info_frame(frame):
+    """Vrai pour une trame d'information Xing/Info/VBRI : sans audio, elle décrit
+    la durée d'un fichier et deviendrait fausse après concaténation."""
+    return b'Xing' in frame[4:48] or b'Info' in frame[4:48] or frame[36:40] == b'VBRI'
+
+
+def id3v2_size(header):
+    """Taille totale d'une étiquette ID3v2 dont `header` contient les 10 premiers octets."""
+    size = 0
+    for byte in header[6:10]:
+        size = (size << 7) | (byte & 0x7F)
+    footer = 10 if header[5] & 0x10 else 0
+    return 10 + size + footer
+
+
+def iter_frames(stream, block_size=BLOCK_SIZE):
+    """Parcourt les trames audio d'un flux MP3 sans le charger en mémoire.
+
+    Les étiquettes ID3v1/ID3v2, les trames Xing/Info et les octets parasites
+    sont ignorés. Produit des tuples `(trame, échantillons, fréquence)`.
+    """
+    buffer = bytearray()
+    position = 0
+    eof = False
+    first_frame = True
+
+    def available(count):
+        nonlocal buffer, position, eof
+        while len(buffer) - position < count and not eof:
+            block = stream.read(block_size)
+            if not block:
+                eof = True
+                break
+            del buffer[:position]
+            position = 0
+            buffer += block
+        return len(buffer) - position >= count
+
+    while available(4):
+        available(10)
+        head = bytes(buffer[position:position + 10])
+        if head[:3] == b'ID3' and len(head) == 10:
+            skip = id3v2_size(head)
+            available(skip)
+            position = min(position + skip, len(buffer))
+            continue
+        if head[:3] == b'TAG' and available(128):
+            position += 128
+            continue
+
+        header = parse_frame_header(head[:4])
+        if header is None:
+            position += 1  # Resynchronisation octet par octet
+            continue
+        frame_length, samples, sample_rate = header
+        if not available(frame_length):
+            break  # Trame tronquée en fin de fichier
+        frame = bytes(buffer[position:position + frame_length])
+        position += frame_length
+        if first_frame:
+            first_frame = False
+            if is_info_frame(frame):
+                continue
+        yield frame, samples, sample_rate
+
+
+def mp3_duration(path):
+    """Durée d'un fichier MP3 en millisecondes, calculée à partir des trames."""
+    duration = 0.0
+    with open(path, 'rb') as f:
+        for _, samples, sample_rate in iter_frames(f):
+            duration += samples / sample_rate
+    return int(round(duration * 1000))
+
+
+def concatenate_mp3(sources, output):
+    """Écrit dans le fichier ouvert `output` les trames audio de chaque fichier de
+    `sources`, sans décodage. Renvoie la durée de chaque source en millisecondes."""
+    durations = []
+    for source in sources:
+        duration = 0.0
+        with open(source, 'rb') as f:
+            for frame, samples, sample_rate in iter_frames(f):
+                output.write(frame)
+                duration += samples / sample_rate
+        durations.append(int(round(duration * 1000)))
+    return durations
+
+
+def id3_frame(frame_id, data):
+    # ID3v2.3 : taille des trames sur 4 octets non « syncsafe », 2 octets de drapeaux
+    return frame_id.encode('ascii') + struct.pack('>I', len(data)) + b'\x00\x00' + data
+
+
+def id3_text_frame(frame_id, text):
+    # Encodage 1 : UTF-16 avec BOM, pour les titres non latins
+    return id3_frame(frame_id, b'\x01' + text.encode('utf-16'))
+
+
+def id3_chapter_frame(element_id, title, start, end):
+    data = element_id.encode('latin-1') + b'\x00' + struct.pack('>IIII', start, end, 0xFFFFFFFF, 0xFFFFFFFF)
+    return id3_frame('CHAP', data + id3_text_frame('TIT2', title))
+
+
+def id3_toc_frame(element_id, children, top_level=False, title=None):
+    flags = 0x01 | (0x02 if top_level else 0)  # Ordonnée, et racine le cas échéant
+    data = element_id.encode('latin-1') + b'\x00' + bytes([flags, len(children)])
+    data += b''.join(child.encode('latin-1') + b'\x00' for child in children)
+    if title:
+        data += id3_text_frame('TIT2', title)
+    return id3_frame('CTOC', data)
+
+
+def build_id3_tag(title, author=None, chapters=()):
+    """Construit une étiquette ID3v2.3 avec titre, auteur et chapitres (CHAP/CTOC).
+
+    `chapters` est une liste de `(titre, début, fin)` en millisecondes. Au-delà de
+    MAX_TOC_ENTRIES chapitres, la table des matières est découpée en sous-tables.
+    """
+    frames = [id3_text_frame('TIT2', title), id3_text_frame('TALB', title)]
+    if author:
+        frames.append(id3_text_frame('TPE1', author))
+
+    chapter_ids = []
+    for index, (chapter_title, start, end) in enumerate(chapters):
+        chapter_ids.append(f'ch{index}')
+        frames.append(id3_chapter_frame(chapter_ids[-1], chapter_title, start, end))
+
+    if chapter_ids:
+        if len(chapter_ids) <= MAX_TOC_ENTRIES:
+            frames.append(id3_toc_frame('toc', chapter_ids, top_level=True))
+        else:
+            groups = [
+                chapter_ids[i:i + MAX_TOC_ENTRIES]
+                for i in range(0, len(chapter_ids), MAX_TOC_ENTRIES)
+            ]
+            group_ids = [f'toc{index}' for index in range(len(groups))]
+            frames.append(id3_toc_frame('toc', group_ids, top_level=True))
+            for group_id, group in zip(group_ids, groups):
+                frames.append(id3_toc_frame(group_id, group))
+
+    body = b''.join(frames)
+    size = len(body)
+    syncsafe = bytes([(size >> 21) & 0x7F, (size >> 14) & 0x7F, (size >> 7) & 0x7F, size & 0x7F])
+    return b'ID3\x03\x00\x00' + syncsafe + body
+
+
+def assemble_book(chapters, output_file, title, author=None):
+    """Assemble les fichiers MP3 des chapitres en un seul livre avec marqueurs.
+
+    `chapters` est une liste de `(titre, fichier)`. Les durées sont calculées
+    dans une première passe (en-têtes des trames), puis l'étiquette et les trames
+    sont écrites en flux dans un fichier temporaire renommé à la fin.
+    """
+    markers = []
+    start = 0
+    for chapter_title, path in chapters:
+        end = start + mp3_duration(path)
+        markers.append((chapter_title, start, end))
+        start = end
+
+    output_dir = os.path.dirname(os.path.abspath(output_file))
+    fd, temp_path = tempfile.mkstemp(dir=output_dir, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as output:
+            output.write(build_id3_tag(title, author, markers))
+            concatenate_mp3([path for _, path in chapters], output)
+        os.replace(temp_path, output_file)
+    except OSError as e:
+        logging.error(f"Erreur lors de l'assemblage de {output_file}: {e}")
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+    return markers
+
+
+__all__ = ['assemble_book', 'build_id3_tag', 'concatenate_mp3', 'iter_frames', 'mp3_duration']
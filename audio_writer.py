@@ -0,0 +1,142 @@
+import asyncio
+import collections
+import hashlib
+import logging
+import os
+
+from async_runtime import get_io_executor, run_io
+
+# Octets audio reçus mais pas encore écrits, toutes synthèses confondues
+DEFAULT_BYTE_BUDGET = 8 * 1024 * 1024
+
+
+class ByteBudget:
+    """Plafond global des octets audio en attente d'écriture sur le disque.
+
+    Chaque bloc reçu réserve sa taille jusqu'à ce qu'il soit écrit. Quand le
+    plafond est atteint, la lecture des flux est suspendue (le service ralentit
+    l'envoi) et les nouvelles requêtes attendent (voir TTSBackend.synthesize) :
+    la mémoire occupée ne dépend pas du nombre de synthèses simultanées. Les
+    réservations sont servies dans l'ordre d'arrivée ; un bloc plus grand que le
+    plafond passe seul.
+    """
+
+    def __init__(self, limit=DEFAULT_BYTE_BUDGET):
+        self.limit = max(1, limit)
+        self.used = 0
+        self.peak = 0
+        # Réservations en attente : (taille, future)
+        self.waiters = collections.deque()
+
+    def fits(self, size):
+        return not self.used or self.used + max(1, size) <= self.limit
+
+    def wake(self):
+        while self.waiters:
+            size, waiter = self.waiters[0]
+            if waiter.done():
+                self.waiters.popleft()  # Attente annulée
+                continue
+            if not self.fits(size):
+                break
+            self.waiters.popleft()
+            self.used += size
+            self.peak = max(self.peak, self.used)
+            waiter.set_result(None)
+
+    async def acquire(self, size):
+        """Réserve `size` octets ; `acquire(0)` attend seulement qu'il reste de la place."""
+        if not self.waiters and self.fits(size):
+            self.used += size
+            self.peak = max(self.peak, self.used)
+            return
+        waiter = asyncio.get_running_loop().create_future()
+        self.waiters.append((size, waiter))
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                self.release(size)
+            raise
+
+    def release(self, size):
+        self.used -= size
+        self.wake()
+
+
+class PartFileWriter:
+    """Écrit un flux audio dans `<output_file>.part`, renommé en `output_file` par
+    `commit` une fois complet : un fichier final n'est jamais tronqué.
+
+    Les écritures se font hors de la boucle, une à la fois et dans l'ordre, pendant
+    que le bloc suivant est reçu ; la somme de contrôle sha256 est calculée au fil
+    de l'écriture, sans relire le fichier.
+    """
+
+    def __init__(self, output_file, budget=None):
+        self.output_file = output_file
+        self.part_file = output_file + '.part'
+        self.budget = budget
+        self.digest = hashlib.sha256()
+        self.file = None
+        self.pending = None
+        self.committed = False
+
+    def write_block(self, block):
+        if self.file is None:
+            self.file = open(self.part_file, 'wb')
+        self.file.write(block)
+        self.digest.update(block)
+
+    async def flush(self):
+        """Attend la fin de l'écriture en cours (et en propage l'erreur)."""
+        if self.pending:
+            pending, self.pending = self.pending, None
+            await pending
+
+    async def write(self, block):
+        size = len(block)
+        if self.budget:
+            await self.budget.acquire(size)
+        try:
+            await self.flush()
+            self.pending = asyncio.get_running_loop().run_in_executor(get_io_executor(), self.write_block, block)
+        except BaseException:
+            if self.budget:
+                self.budget.release(size)
+            raise
+        if self.budget:
+            self.pending.add_done_callback(lambda _: self.budget.release(size))
+
+    def close_and_rename(self):
+        if self.file is None:
+            self.file = open(self.part_file, 'wb')
+        self.file.close()
+        os.replace(self.part_file, self.output_file)
+
+    async def commit(self):
+        """Termine l'écriture, renomme le fichier et renvoie sa somme de contrôle."""
+        await self.flush()
+        await run_io(self.close_and_rename)
+        self.committed = True
+        return self.digest.hexdigest()
+
+    async def abort(self):
+        """Abandonne un fichier incomplet (sans effet après `commit`)."""
+        if self.committed:
+            return
+        try:
+            await self.flush()
+        except Exception:
+            pass
+        if self.file:
+            self.file.close()
+        try:
+            os.remove(self.part_file)
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            logging.warning(f"Impossible de supprimer {self.part_file}: {e}")
+
+
+__all__ = ['ByteBudget', 'PartFileWriter', 'DEFAULT_BYTE_BUDGET']
@@ -0,0 +1 @@
+"""Mesures de performance de l'analyse et de la conversion (voir run.py)."""
@@ -0,0 +1,162 @@
+"""Génération de livres synthétiques (ePub et PDF) pour les mesures.
+
+Le contenu est pseudo-aléatoire mais déterministe (graine fixe) : deux
+exécutions produisent les mêmes fichiers et restent comparables.
+"""
+import random
+import zipfile
+
+VOCABULARY = (
+    'le la les un une des et en dans pour avec sur chat souris maison jardin '
+    'livre porte fenêtre soleil nuit matin ville route mer forêt rivière '
+    'marche regarde pense dort mange écrit attend revient parle lentement '
+    'toujours jamais encore déjà bientôt grand petit vieux nouveau calme'
+).split()
+# Vocabulaire sans accents pour les PDF (police standard Helvetica)
+PDF_VOCABULARY = [word for word in VOCABULARY if word.isascii()]
+
+
+def make_paragraphs(rng, word_count, vocabulary=VOCABULARY, words_per_paragraph=80):
+    """Produit des paragraphes de phrases de 6 à 18 mots totalisant `word_count` mots."""
+    paragraphs = []
+    remaining = word_count
+    while remaining > 0:
+        sentences = []
+        paragraph_words = min(remaining, words_per_paragraph)
+        remaining -= paragraph_words
+        while paragraph_words > 0:
+            length = min(paragraph_words, rng.randint(6, 18))
+            paragraph_words -= length
+            words = [rng.choice(vocabulary) for _ in range(length)]
+            sentences.append(words[0].capitalize() + ' ' + ' '.join(words[1:]) + rng.choice('..!?'))
+        paragraphs.append(' '.join(sentences))
+    return paragraphs
+
+
+def make_epub(path, chapters=50, words_per_chapter=2000, nested=False, ncx_depth=1, padding_bytes=0, seed=0):
+    """Écrit un ePub synthétique.
+
+    `nested` range les chapitres dans des sous-dossiers (`Text/partie_N/`),
+    `ncx_depth` ajoute des sous-sections pointant vers des ancres internes et
+    `padding_bytes` ajoute une ressource binaire pour grossir l'archive.
+    """
+    rng = random.Random(seed)
+    sections = max(1, ncx_depth)
+    manifest = []
+    nav_points = []
+    play_order = 0
+
+    with zipfile.ZipFile(path, 'w', zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr('mimetype', 'application/epub+zip', compress_type=zipfile.ZIP_STORED)
+        archive.writestr('META-INF/container.xml', (
+            '<?xml version="1.0"?>'
+            '<container version="1.0" xmlns="urn:oasis:names:tc:opendocument:xmlns:container">'
+            '<rootfiles><rootfile full-path="OEBPS/content.opf" media-type="application/oebps-package+xml"/>'
+            '</rootfiles></container>'
+        ))
+
+        for index in range(1, chapters + 1):
+            href = f'Text/partie_{(index - 1) // 10 + 1}/chapitre_{index}.xhtml' if nested else f'chapitre_{index}.xhtml'
+            body = [f'<h1>Chapitre {index}</h1>']
+            paragraphs = make_paragraphs(rng, words_per_chapter)
+            per_section = -(-len(paragraphs) // sections)
+            for section in range(sections):
+                if section:
+                    body.append(f'<h2 id="s{section}">Section {index}.{section}</h2>')
+                body.extend(f'<p>{paragraph}</p>' for paragraph in paragraphs[section * per_section:(section + 1) * per_section])
+            archive.writestr('OEBPS/' + href, (
+                '<?xml version="1.0" encoding="utf-8"?>'
+                '<html xmlns="http://www.w3.org/1999/xhtml"><head><title>Chapitre</title></head>'
+                f'<body>{"".join(body)}</body></html>'
+            ))
+            manifest.append((f'c{index}', href))
+
+            # Sous-sections imbriquées sur `ncx_depth` niveaux
+            play_order += 1
+            children = ''
+            for section in range(sections - 1, 0, -1):
+                play_order += 1
+                children = (
+                    f'<navPoint id="n{index}_{section}" playOrder="{play_order}">'
+                    f'<navLabel><text>Section {index}.{section}</text></navLabel>'
+                    f'<content src="{href}#s{section}"/>{children}</navPoint>'
+                )
+            nav_points.append(
+                f'<navPoint id="n{index}" playOrder="{play_order}">'
+                f'<navLabel><text>Chapitre {index}</text></navLabel>'
+                f'<content src="{href}"/>{children}</navPoint>'
+            )
+
+        if padding_bytes:
+            archive.writestr('OEBPS/images/padding.bin', rng.randbytes(padding_bytes) if hasattr(rng, 'randbytes')
+                             else bytes(rng.getrandbits(8) for _ in range(padding_bytes)))
+
+        archive.writestr('OEBPS/toc.ncx', (
+            '<?xml version="1.0" encoding="utf-8"?>'
+            '<ncx xmlns="http://www.daisy.org/z3986/2005/ncx/" version="2005-1"><navMap>'
+            + ''.join(nav_points) + '</navMap></ncx>'
+        ))
+        archive.writestr('OEBPS/content.opf', (
+            '<?xml version="1.0" encoding="utf-8"?>'
+            '<package xmlns="http://www.idpf.org/2007/opf" version="2.0">'
+            '<metadata xmlns:dc="http://purl.org/dc/elements/1.1/">'
+            '<dc:title>Livre synthétique</dc:title><dc:creator>Benchmark</dc:creator></metadata>'
+            '<manifest><item id="ncx" href="toc.ncx" media-type="application/x-dtbncx+xml"/>'
+            + ''.join(f'<item id="{item_id}" href="{href}" media-type="application/xhtml+xml"/>' for item_id, href in manifest)
+            + '</manifest><spine toc="ncx">'
+            + ''.join(f'<itemref idref="{item_id}"/>' for item_id, _ in manifest)
+            + '</spine></package>'
+        ))
+    return path
+
+
+def escape_pdf_text(text):
+    return text.replace('\\', '\\\\').replace('(', '\\(').replace(')', '\\)')
+
+
+def make_pdf(path, chapters=20, lines_per_chapter=200, lines_per_page=40, seed=0):
+    """Écrit un PDF synthétique : titres « Chapitre N » en corps 24, texte en corps 11."""
+    rng = random.Random(seed)
+    pages = []
+    for index in range(1, chapters + 1):
+        lines = [(24, f'Chapitre {index}')]
+        for paragraph in make_paragraphs(rng, lines_per_chapter * 12, PDF_VOCABULARY, words_per_paragraph=60):
+            words = paragraph.split()
+            lines.extend((11, ' '.join(words[i:i + 12])) for i in range(0, len(words), 12))
+        for start in range(0, len(lines), lines_per_page):
+            pages.append(lines[start:start + lines_per_page])
+
+    objects = ['<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>', None]
+    kids = []
+    for page in pages:
+        y = 760
+        commands = []
+        for size, text in page:
+            commands.append(f'BT /F1 {size} Tf 50 {y} Td ({escape_pdf_text(text)}) Tj ET')
+            y -= size + 6
+        stream = '\n'.join(commands).encode('latin-1')
+        objects.append(f'<< /Length {len(stream)} >>\nstream\n'.encode('latin-1') + stream + b'\nendstream')
+        objects.append(
+            f'<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] '
+            f'/Resources << /Font << /F1 1 0 R >> >> /Contents {len(objects)} 0 R >>'
+        )
+        kids.append(f'{len(objects)} 0 R')
+    objects[1] = f'<< /Type /Pages /Kids [{" ".join(kids)}] /Count {len(kids)} >>'
+    objects.append('<< /Type /Catalog /Pages 2 0 R >>')
+
+    with open(path, 'wb') as f:
+        f.write(b'%PDF-1.4\n')
+        offsets = []
+        for number, body in enumerate(objects, 1):
+            offsets.append(f.tell())
+            if isinstance(body, str):
+                body = body.encode('latin-1')
+            f.write(f'{number} 0 obj\n'.encode('latin-1') + body + b'\nendobj\n')
+        xref = f.tell()
+        f.write(f'xref\n0 {len(objects) + 1}\n0000000000 65535 f \n'.encode('latin-1'))
+        f.write(''.join(f'{offset:010d} 00000 n \n' for offset in offsets).encode('latin-1'))
+        f.write(f'trailer\n<< /Size {len(objects) + 1} /Root {len(objects)} 0 R >>\nstartxref\n{xref}\n%%EOF\n'.encode('latin-1'))
+    return path
+
+
+__all__ = ['make_epub', 'make_pdf', 'make_paragraphs']
@@ -0,0 +1,86 @@
+"""Faux service TTS local (HTTP) avec latence et taux d'échec réglables.
+
+Il renvoie des trames MP3 valides (MPEG-2 couche III, 24 kHz, 48 kbit/s, mono)
+dont la durée est proportionnelle au texte, ce qui permet d'exercer tout le
+pipeline de conversion (cache, manifeste, assemblage) sans réseau.
+"""
+import asyncio
+import random
+
+import aiohttp
+from aiohttp import web
+
+from tts_backends import SILENT_MP3_FRAME as MP3_FRAME
+
+# Environ 15 caractères lus par seconde
+FRAMES_PER_CHARACTER = 1 / (15 * 0.024)
+
+
+class FakeTTSServer:
+    """Serveur aiohttp répondant à `POST /synthesize` (`{"text": ...}`)."""
+
+    def __init__(self, latency=0.05, jitter=0.02, failure_rate=0.0, seed=0):
+        self.latency = latency
+        self.jitter = jitter
+        self.failure_rate = failure_rate
+        self.random = random.Random(seed)
+        self.runner = None
+        self.url = None
+        self.requests = 0
+        self.failures = 0
+
+    async def handle(self, request):
+        payload = await request.json()
+        self.requests += 1
+        await asyncio.sleep(max(0.0, self.latency + self.random.uniform(-self.jitter, self.jitter)))
+        if self.random.random() < self.failure_rate:
+            self.failures += 1
+            return web.Response(status=503, text='Service indisponible')
+        frames = max(1, int(len(payload['text']) * FRAMES_PER_CHARACTER))
+        return web.Response(body=MP3_FRAME * frames, content_type='audio/mpeg')
+
+    async def start(self):
+        app = web.Application()
+        app.router.add_post('/synthesize', self.handle)
+        self.runner = web.AppRunner(app)
+        await self.runner.setup()
+        site = web.TCPSite(self.runner, '127.0.0.1', 0)
+        await site.start()
+        port = self.runner.addresses[0][1]
+        self.url = f'http://127.0.0.1:{port}/synthesize'
+        return self.url
+
+    async def stop(self):
+        if self.runner:
+            await self.runner.cleanup()
+            self.runner = None
+
+
+class FakeTTSClient:
+    """Fonction de synthèse compatible avec ConversionEngine, qui interroge le faux service."""
+
+    def __init__(self, url):
+        self.url = url
+        self.session = None
+
+    async def __call__(self, text, voice, output_file, **prosody):
+        if self.session is None:
+            self.session = aiohttp.ClientSession()
+        try:
+            async with self.session.post(self.url, json={'text': text, 'voice': voice, **prosody}) as response:
+                if response.status != 200:
+                    return False
+                with open(output_file, 'wb') as f:
+                    async for block in response.content.iter_chunked(64 * 1024):
+                        f.write(block)
+            return True
+        except aiohttp.ClientError:
+            return False
+
+    async def close(self):
+        if self.session:
+            await self.session.close()
+            self.session = None
+
+
+__all__ = ['FakeTTSServer', 'FakeTTSClient']
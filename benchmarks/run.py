@@ -0,0 +1,325 @@
+"""Mesure les étapes d'analyse et de conversion sur des livres synthétiques.
+
+Exemples :
+    python -m benchmarks.run --preset quick -o bench.json
+    python -m benchmarks.run --preset full --stages epub conversion --compare bench.json
+
+Chaque résultat indique la durée (meilleure de `--repeat` exécutions) et le pic
+de mémoire Python (tracemalloc, exécution séparée). Le fichier JSON produit
+peut être passé à `--compare` lors d'une exécution ultérieure.
+"""
+import argparse
+import asyncio
+import datetime
+import gc
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.corpus import make_epub, make_paragraphs, make_pdf
+
+PRESETS = {
+    'quick': {
+        'epub': [
+            {'chapters': 20, 'words_per_chapter': 1000, 'nested': False, 'ncx_depth': 1},
+            {'chapters': 100, 'words_per_chapter': 300, 'nested': True, 'ncx_depth': 3},
+        ],
+        'pdf': [
+            {'chapters': 10, 'lines_per_chapter': 100},
+        ],
+        'text': [
+            {'lines': 50000},
+        ],
+        'conversion': [
+            {'chapters': 10, 'words_per_chapter': 600, 'chunk_size': 1000, 'batch_size': 8},
+        ],
+    },
+    'full': {
+        'epub': [
+            {'chapters': 50, 'words_per_chapter': 2000, 'nested': False, 'ncx_depth': 1},
+            {'chapters': 500, 'words_per_chapter': 300, 'nested': True, 'ncx_depth': 3},
+            {'chapters': 2000, 'words_per_chapter': 100, 'nested': True, 'ncx_depth': 2},
+            {'chapters': 20, 'words_per_chapter': 20000, 'nested': False, 'ncx_depth': 1,
+             'padding_bytes': 5 * 1024 * 1024},
+        ],
+        'pdf': [
+            {'chapters': 20, 'lines_per_chapter': 200},
+            {'chapters': 100, 'lines_per_chapter': 300},
+        ],
+        'text': [
+            {'lines': 1000000},
+        ],
+        'conversion': [
+            {'chapters': 50, 'words_per_chapter': 1500, 'chunk_size': 3000, 'batch_size': 5},
+            {'chapters': 50, 'words_per_chapter': 1500, 'chunk_size': 1000, 'batch_size': 16},
+        ],
+    },
+}
+STAGES = ('epub', 'pdf', 'text', 'conversion')
+
+
+def log(message):
+    print(message, file=sys.stderr, flush=True)
+
+
+def measure(stage, params, function, repeat=3, memory=True):
+    """Exécute `function` `repeat` fois et renvoie la meilleure durée, puis une
+    fois sous tracemalloc pour le pic de mémoire.
+
+    `function()` peut renvoyer un dictionnaire de mesures ajoutées au résultat.
+    """
+    best = None
+    extra = {}
+    for _ in range(max(1, repeat)):
+        gc.collect()
+        started = time.perf_counter()
+        extra = function() or {}
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+
+    result = {'stage': stage, 'params': params, 'seconds': round(best, 4), 'runs': max(1, repeat)}
+    if memory:
+        gc.collect()
+        tracemalloc.start()
+        try:
+            function()
+            result['peak_memory'] = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+    result.update(extra)
+    log(f"{stage} {json.dumps(params, sort_keys=True)}: {result['seconds']:.3f}s")
+    return result
+
+
+def bench_epub(corpus_dir, configs, args):
+    from epub_processor import EpubProcessor
+
+    parsers = ['html.parser']
+    try:
+        import lxml  # noqa: F401
+        parsers.append('lxml')
+    except ImportError:
+        pass
+
+    results = []
+    for index, config in enumerate(configs):
+        path = make_epub(os.path.join(corpus_dir, f'livre_{index}.epub'), **config)
+        for parser in parsers:
+            params = dict(config, parser=parser, workers=args.workers, size=os.path.getsize(path))
+
+            def analyze():
+                chapters = EpubProcessor(max_workers=args.workers, parser=parser).analyze_epub(path)
+                return {'chapters_found': len(chapters)}
+
+            results.append(measure('epub_analysis', params, analyze, args.repeat, args.memory))
+    return results
+
+
+def bench_pdf(corpus_dir, configs, args):
+    from epub_processor import PdfProcessor
+
+    results = []
+    for index, config in enumerate(configs):
+        path = make_pdf(os.path.join(corpus_dir, f'livre_{index}.pdf'), **config)
+        for streaming in (False, True):
+            params = dict(config, streaming=streaming, workers=args.workers, size=os.path.getsize(path))
+
+            def analyze():
+                chapters = PdfProcessor(max_workers=args.workers, streaming=streaming).analyze_pdf(path)
+                return {'chapters_found': len(chapters)}
+
+            results.append(measure('pdf_analysis', params, analyze, args.repeat, args.memory))
+    return results
+
+
+def bench_text(configs, args):
+    from epub_processor import clean_and_format_text
+    import random
+
+    results = []
+    for config in configs:
+        rng = random.Random(0)
+        words = ' '.join(make_paragraphs(rng, config['lines'] * 12)).split()
+        text = '\n'.join(' '.join(words[i:i + 12]) for i in range(0, len(words), 12))
+        params = dict(config, characters=len(text))
+        results.append(measure('text_formatting', params, lambda: clean_and_format_text(text) and None,
+                               args.repeat, args.memory))
+    return results
+
+
+async def convert_with_fake_tts(chapters, work_dir, config, args):
+    """Conversion contre le faux service HTTP (`--tts http`, nécessite aiohttp) ou
+    le moteur silencieux hors ligne (`--tts silence`, sans réseau ni échec)."""
+    from audio_assembly import assemble_book
+    from conversion_engine import ConversionEngine
+
+    if args.tts == 'http':
+        from benchmarks.fake_tts import FakeTTSClient, FakeTTSServer
+        server = FakeTTSServer(latency=args.latency, jitter=args.latency / 2, failure_rate=args.failure_rate)
+        client = FakeTTSClient(await server.start())
+        synthesize = client
+        service = 'fake-http'
+    else:
+        from audio_writer import ByteBudget
+        from tts_backends import SilenceBackend
+        server = client = None
+        backend = SilenceBackend(latency=args.latency)
+        backend.byte_budget = ByteBudget()
+        synthesize = backend.synthesize
+        service = backend.identity()
+    try:
+        engine = ConversionEngine(synthesize, batch_size=config['batch_size'], retry_count=10, retry_delays={},
+                                  service=service)
+        started = time.perf_counter()
+        converted = await engine.convert_chapters(chapters, 'fr-FR-DeniseNeural', config['chunk_size'])
+        synthesis_seconds = time.perf_counter() - started
+
+        started = time.perf_counter()
+        assemble_book(
+            [(chapter['title'], chapter['output_file']) for chapter in chapters],
+            os.path.join(work_dir, 'livre.mp3'), 'Livre synthétique'
+        )
+        assembly_seconds = time.perf_counter() - started
+    finally:
+        if server:
+            await client.close()
+            await server.stop()
+
+    return {
+        'chapters_converted': converted,
+        'segments': engine.total_count,
+        'characters': engine.total_chars,
+        'bytes': engine.session_bytes,
+        'requests': server.requests if server else engine.total_count,
+        'failures': server.failures if server else 0,
+        'synthesis_seconds': round(synthesis_seconds, 4),
+        'assembly_seconds': round(assembly_seconds, 4),
+        'chars_per_second': round(engine.total_chars / synthesis_seconds, 1) if synthesis_seconds else None,
+    }
+
+
+def bench_conversion(work_root, configs, args):
+    import random
+
+    results = []
+    for config in configs:
+        rng = random.Random(0)
+        texts = [' '.join(make_paragraphs(rng, config['words_per_chapter'])) for _ in range(config['chapters'])]
+        params = dict(config, tts=args.tts, latency=args.latency,
+                      failure_rate=args.failure_rate if args.tts == 'http' else 0)
+
+        def convert():
+            # Dossier neuf à chaque exécution : aucun segment n'est déjà converti
+            work_dir = tempfile.mkdtemp(dir=work_root)
+            try:
+                chapters = [
+                    {
+                        'title': f'Chapitre {index + 1}',
+                        'content': text,
+                        'output_file': os.path.join(work_dir, f'{index + 1:03d}.mp3'),
+                        'processed': False,
+                        'attempts': 0
+                    }
+                    for index, text in enumerate(texts)
+                ]
+                return asyncio.run(convert_with_fake_tts(chapters, work_dir, config, args))
+            finally:
+                shutil.rmtree(work_dir, ignore_errors=True)
+
+        results.append(measure('conversion', params, convert, args.repeat, args.memory))
+    return results
+
+
+def result_key(result):
+    return result['stage'] + ' ' + json.dumps(result['params'], sort_keys=True)
+
+
+def compare(previous_path, results):
+    """Affiche le rapport des durées avec une exécution précédente."""
+    with open(previous_path, 'r', encoding='utf-8') as f:
+        previous = {result_key(result): result for result in json.load(f)['results']}
+    for result in results:
+        before = previous.get(result_key(result))
+        if not before:
+            continue
+        ratio = result['seconds'] / before['seconds'] if before['seconds'] else float('inf')
+        log(f"{result_key(result)}: {before['seconds']:.3f}s -> {result['seconds']:.3f}s (x{ratio:.2f})")
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', 'HEAD'], capture_output=True, text=True, check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__))
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Mesures de performance sur des livres synthétiques.")
+    parser.add_argument('--preset', choices=sorted(PRESETS), default='quick', help="Taille des corpus")
+    parser.add_argument('--stages', nargs='+', choices=STAGES, default=list(STAGES), help="Étapes à mesurer")
+    parser.add_argument('-o', '--output', help="Fichier JSON des résultats (sortie standard par défaut)")
+    parser.add_argument('--compare', help="Résultats précédents à comparer")
+    parser.add_argument('--repeat', type=int, default=3, help="Exécutions par mesure (meilleure durée retenue)")
+    parser.add_argument('--workers', type=int, default=1, help="Processus d'extraction (1 : séquentiel)")
+    parser.add_argument('--tts', choices=('http', 'silence'), default='http',
+                        help="Faux service HTTP local ou moteur silencieux hors ligne")
+    parser.add_argument('--latency', type=float, default=0.02, help="Latence du faux service TTS (s)")
+    parser.add_argument('--failure-rate', type=float, default=0.05, help="Taux d'échec du faux service TTS")
+    parser.add_argument('--no-memory', dest='memory', action='store_false', help="Ne pas mesurer le pic de mémoire")
+    parser.add_argument('--corpus-dir', help="Dossier où conserver les livres générés")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    preset = PRESETS[args.preset]
+    corpus_dir = args.corpus_dir or tempfile.mkdtemp(prefix='audiobook_bench_')
+    os.makedirs(corpus_dir, exist_ok=True)
+
+    results = []
+    try:
+        if 'epub' in args.stages:
+            results.extend(bench_epub(corpus_dir, preset['epub'], args))
+        if 'pdf' in args.stages:
+            results.extend(bench_pdf(corpus_dir, preset['pdf'], args))
+        if 'text' in args.stages:
+            results.extend(bench_text(preset['text'], args))
+        if 'conversion' in args.stages:
+            results.extend(bench_conversion(corpus_dir, preset['conversion'], args))
+    finally:
+        if not args.corpus_dir:
+            shutil.rmtree(corpus_dir, ignore_errors=True)
+
+    report = {
+        'created': datetime.datetime.now().isoformat(timespec='seconds'),
+        'commit': git_commit(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'preset': args.preset,
+        'results': results,
+    }
+    if args.compare:
+        compare(args.compare, results)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+    else:
+        json.dump(report, sys.stdout, ensure_ascii=False, indent=2)
+        sys.stdout.write('\n')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,174 @@
+"""Conversion en ligne de commande, sans interface graphique.
+
+Exemple :
+    python cli.py ~/Livres "~/Téléchargements/*.epub" -o ~/LivresAudio --voice fr-FR-DeniseNeural
+
+La progression est écrite sur la sortie standard, un objet JSON par ligne ;
+les journaux de l'application sont redirigés vers la sortie d'erreur.
+"""
+import argparse
+import asyncio
+import contextlib
+import glob
+import json
+import logging
+import os
+import sys
+import time
+
+from concurrency_limiter import AdaptiveLimiter
+from main import ApiInterface
+from tts_backends import BACKENDS
+
+SUPPORTED_EXTENSIONS = ('.epub', '.pdf')
+
+
+def find_books(sources):
+    """Résout une liste de fichiers, dossiers (parcourus récursivement) ou motifs glob."""
+    books = []
+    for source in sources:
+        source = os.path.expanduser(source)
+        if os.path.isdir(source):
+            for root, _, files in os.walk(source):
+                books.extend(
+                    os.path.join(root, name) for name in sorted(files)
+                    if name.lower().endswith(SUPPORTED_EXTENSIONS)
+                )
+        elif os.path.isfile(source):
+            books.append(source)
+        else:
+            books.extend(
+                path for path in sorted(glob.glob(source, recursive=True))
+                if os.path.isfile(path) and path.lower().endswith(SUPPORTED_EXTENSIONS)
+            )
+
+    # Supprimer les doublons en conservant l'ordre
+    unique_books = []
+    seen = set()
+    for book in books:
+        path = os.path.abspath(book)
+        if path not in seen:
+            seen.add(path)
+            unique_books.append(book)
+    return unique_books
+
+
+class ProgressWriter:
+    """Écrit les événements de progression au format JSON Lines."""
+
+    def __init__(self, stream):
+        self.stream = stream
+
+    def emit(self, event, **fields):
+        fields = dict(event=event, time=round(time.time(), 3), **fields)
+        self.stream.write(json.dumps(fields, ensure_ascii=False) + '\n')
+        self.stream.flush()
+
+
+async def convert_library(api, books, args, progress):
+    # Limite adaptative globale de synthèses simultanées, partagée par tous les livres
+    synthesis_limiter = AdaptiveLimiter(args.concurrency)
+    book_semaphore = asyncio.Semaphore(args.books)
+
+    async def convert(book):
+        async with book_semaphore:
+            started = time.monotonic()
+            progress.emit('start', book=book)
+            last_percent = -1
+
+            def on_progress(state):
+                nonlocal last_percent
+                if state['percent'] != last_percent:
+                    last_percent = state['percent']
+                    progress.emit('progress', book=book, **state)
+
+            try:
+                result = await api.convert_book(
+                    book, args.output, args.voice,
+                    resume=args.resume,
+                    limiter=synthesis_limiter,
+                    on_progress=on_progress,
+                    service=args.service
+                )
+            except Exception as e:
+                logging.exception(f"Échec de la conversion de {book}")
+                result = {'status': 'error', 'message': str(e)}
+
+            progress.emit('done', book=book, elapsed=round(time.monotonic() - started, 3), **result)
+            return result
+
+    return await asyncio.gather(*(convert(book) for book in books))
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Convertit des ePub/PDF en livres audio sans interface graphique.")
+    parser.add_argument('sources', nargs='+', help="Fichiers, dossiers ou motifs glob (*.epub, *.pdf)")
+    parser.add_argument('-o', '--output', required=True, help="Dossier d'export")
+    parser.add_argument('--service', choices=sorted(BACKENDS), default='edge',
+                        help="Moteur de synthèse (espeak et silence fonctionnent hors ligne)")
+    parser.add_argument('--voice', help="Voix du moteur (par défaut : voix française du moteur)")
+    parser.add_argument('--concurrency', type=int, default=8, help="Synthèses simultanées au maximum, tous livres confondus (adaptées au service)")
+    parser.add_argument('--books', type=int, default=2, help="Livres traités simultanément")
+    parser.add_argument('--chunk-size', type=int, help="Taille max d'un segment (caractères)")
+    parser.add_argument('--retry-count', type=int, help="Nombre de tentatives par segment")
+    parser.add_argument('--rate', default='+0%', help="Débit de la voix (ex. +10%%)")
+    parser.add_argument('--pitch', default='+0Hz', help="Hauteur de la voix (ex. -2Hz)")
+    parser.add_argument('--single-file', action='store_true', help="Assembler aussi un MP3 unique avec chapitres")
+    parser.add_argument('--resume', action='store_true', help="Reprendre les conversions interrompues")
+    parser.add_argument('--verbose', action='store_true', help="Journaux détaillés sur la sortie d'erreur")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    args.concurrency = max(1, args.concurrency)
+    args.books = max(1, args.books)
+    logging.basicConfig(level=logging.INFO if args.verbose else logging.WARNING, stream=sys.stderr)
+
+    progress = ProgressWriter(sys.stdout)
+    books = []
+    output_names = {}
+    for book in find_books(args.sources):
+        # Chaque livre est exporté dans <output>/<nom du fichier> : pas de doublon possible
+        output_name = os.path.splitext(os.path.basename(book))[0]
+        if output_name in output_names:
+            progress.emit('skipped', book=book, message=f"Même dossier de sortie que {output_names[output_name]}")
+            continue
+        output_names[output_name] = book
+        books.append(book)
+    progress.emit('library', books=books, total=len(books))
+    if not books:
+        return 1
+
+    # Les messages de l'application (print) ne doivent pas se mêler au flux JSON
+    with contextlib.redirect_stdout(sys.stderr):
+        api = ApiInterface()
+        settings = {}
+        if args.chunk_size:
+            settings['chunkSize'] = args.chunk_size
+        if args.retry_count:
+            settings['retryCount'] = args.retry_count
+        api.update_batch_settings(settings)
+        api.rate = args.rate
+        api.single_file = args.single_file
+        api.pitch = args.pitch
+
+        started = time.monotonic()
+        try:
+            results = api.runtime.run(convert_library(api, books, args, progress))
+        finally:
+            api.runtime.stop()
+
+    succeeded = sum(1 for result in results if result['status'] == 'success')
+    progress.emit(
+        'summary',
+        books=len(books),
+        succeeded=succeeded,
+        failed=len(books) - succeeded,
+        elapsed=round(time.monotonic() - started, 3)
+    )
+    return 0 if succeeded == len(books) else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,121 @@
+import asyncio
+import heapq
+import time
+from collections import deque
+
+# Latence (par caractère) tolérée par rapport à la meilleure observée avant de plafonner
+DEFAULT_LATENCY_TOLERANCE = 2.0
+# Facteur appliqué à la limite après un échec (throttling, délai dépassé, erreur HTTP)
+DEFAULT_DECREASE_FACTOR = 0.5
+
+
+def percentile(values, fraction):
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+class AdaptiveLimiter:
+    """Limite adaptative (AIMD) du nombre de synthèses simultanées.
+
+    La limite démarre bas et croît d'une unité par succès (démarrage lent), puis
+    d'environ une unité par « aller-retour » complet (+1/limite par succès) tant
+    que la latence par caractère reste proche de la meilleure observée. Un échec
+    la divise par deux, au plus une fois par vague de requêtes : seules les
+    requêtes lancées après la dernière baisse peuvent en provoquer une nouvelle.
+    `max_limit` (le réglage de l'utilisateur) n'est jamais dépassé.
+
+    Les places libérées sont attribuées par priorité croissante (voir `acquire`),
+    puis dans l'ordre d'arrivée. Un même limiteur peut être partagé par plusieurs
+    moteurs (voir cli.py).
+    """
+
+    def __init__(self, max_limit, min_limit=1, initial_limit=None, decrease_factor=DEFAULT_DECREASE_FACTOR,
+                 latency_tolerance=DEFAULT_LATENCY_TOLERANCE, window=100):
+        self.max_limit = max(1, max_limit)
+        self.min_limit = max(1, min(min_limit, self.max_limit))
+        self.limit = float(min(self.max_limit, initial_limit or 2))
+        self.decrease_factor = decrease_factor
+        self.latency_tolerance = latency_tolerance
+        self.slow_start = True
+        self.in_flight = 0
+        self.latencies = deque(maxlen=window)
+        self.costs = deque(maxlen=window)  # Latence par caractère
+        self.last_decrease = 0
+        self.successes = 0
+        self.failures = 0
+        # Requêtes en attente : tas de (priorité, ordre d'arrivée, future)
+        self.waiters = []
+        self.sequence = 0
+
+    def wake(self):
+        """Attribue les places libres aux requêtes en attente les plus prioritaires."""
+        while self.waiters and self.in_flight < int(self.limit):
+            _, _, waiter = heapq.heappop(self.waiters)
+            if waiter.done():
+                continue  # Attente annulée
+            self.in_flight += 1
+            waiter.set_result(None)
+
+    async def acquire(self, priority=0):
+        """Attend une place libre, la plus petite `priority` passant en premier (les
+        priorités d'un même limiteur doivent être comparables entre elles) ; renvoie
+        l'instant de départ à passer à `release`."""
+        waiter = asyncio.get_running_loop().create_future()
+        self.sequence += 1
+        heapq.heappush(self.waiters, (priority, self.sequence, waiter))
+        self.wake()
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # Place attribuée juste avant l'annulation : elle est rendue
+                self.in_flight -= 1
+                self.wake()
+            raise
+        return time.monotonic()
+
+    async def release(self, started, success, size=1):
+        """Libère la place et ajuste la limite selon l'issue et la latence de la requête."""
+        now = time.monotonic()
+        self.in_flight -= 1
+        if success:
+            self.on_success(now - started, size)
+        else:
+            self.on_failure(started, now)
+        self.wake()
+
+    def on_success(self, latency, size):
+        self.successes += 1
+        self.latencies.append(latency)
+        cost = latency / max(size, 1)
+        self.costs.append(cost)
+        if cost > min(self.costs) * self.latency_tolerance:
+            # Le service ralentit : on conserve la limite actuelle
+            self.slow_start = False
+            return
+        self.limit += 1 if self.slow_start else 1 / self.limit
+        self.limit = min(self.limit, float(self.max_limit))
+
+    def on_failure(self, started, now):
+        self.failures += 1
+        if started < self.last_decrease:
+            return  # Requête de la vague précédente, déjà prise en compte
+        self.slow_start = False
+        self.limit = max(float(self.min_limit), self.limit * self.decrease_factor)
+        self.last_decrease = now
+
+    def stats(self):
+        """Concurrence courante et percentiles de latence (secondes) sur la fenêtre récente."""
+        p50 = percentile(self.latencies, 0.5)
+        p95 = percentile(self.latencies, 0.95)
+        return {
+            'concurrency': int(self.limit),
+            'in_flight': self.in_flight,
+            'latency_p50': round(p50, 3) if p50 is not None else None,
+            'latency_p95': round(p95, 3) if p95 is not None else None
+        }
+
+
+__all__ = ['AdaptiveLimiter']
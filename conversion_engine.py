@@ -0,0 +1,356 @@
+import asyncio
+import logging
+import os
+import time
+
+from async_runtime import run_io
+from audio_assembly import concatenate_mp3
+from concurrency_limiter import AdaptiveLimiter
+from duration_model import DurationModel
+from job_manifest import file_checksum, segment_text_hash
+from text_chunker import DEFAULT_CHUNK_SIZE, split_text
+
+
+class ConversionEngine:
+    """Moteur de conversion asynchrone : synthétise plusieurs segments en parallèle.
+
+    La fonction de synthèse est injectée (en général `TTSBackend.synthesize`, voir
+    tts_backends.py), ce qui permet de faire tourner le moteur contre un moteur
+    hors ligne ou un faux service TTS local.
+
+    Les segments les plus longs sont synthétisés en premier (à durée égale, ceux
+    des plus longs chapitres) : les plus courts comblent la fin de la conversion
+    au lieu de la prolonger. Leur durée est estimée par un DurationModel, mis à
+    jour à chaque synthèse réussie, qui donne aussi le temps restant.
+    """
+
+    def __init__(self, synthesize, batch_size=5, retry_count=20, retry_delays=None, on_progress=None,
+                 cache=None, prosody=None, manifest=None, limiter=None, timeout=None, duration_model=None,
+                 service=''):
+        # synthesize(text, voice, output_file, **prosody) -> coroutine renvoyant True/False,
+        # ou la somme de contrôle sha256 du fichier écrit (évite de le relire)
+        self.synthesize = synthesize
+        # Identité du moteur (TTSBackend.identity) : clé du cache et du modèle de durée
+        self.service = service
+        self.cache = cache  # SynthesisCache optionnel
+        self.prosody = prosody or {}  # Paramètres de prosodie (rate, pitch...)
+        self.manifest = manifest  # JobManifest optionnel pour la reprise
+        # AdaptiveLimiter partagé entre plusieurs moteurs (limite globale de synthèses)
+        self.limiter = limiter
+        self.active_limiter = None
+        # DurationModel partagé et enregistré d'une conversion à l'autre (sinon en mémoire)
+        self.duration_model = duration_model or DurationModel()
+        self.voice = None
+        # Limite haute de la concurrence adaptative
+        self.batch_size = max(1, batch_size)
+        # Durée maximale d'une synthèse (secondes) avant de la compter comme un échec
+        self.timeout = timeout
+        self.retry_count = max(1, retry_count)
+        self.retry_delays = retry_delays or {}
+        # on_progress(state) reçoit l'état renvoyé par progress_state()
+        self.on_progress = on_progress
+        self.processed_count = 0
+        self.total_count = 0
+        self.processed_chars = 0
+        self.total_chars = 0
+        # Débit mesuré sur les segments traités depuis le début de run()
+        self.session_chars = 0
+        self.session_bytes = 0
+        self.started = None
+        # Vrai tant que des chapitres peuvent encore arriver (voir convert_stream)
+        self.analyzing = False
+
+    def get_retry_delay(self, attempt):
+        """Renvoie la pause (en secondes) à appliquer après la tentative `attempt`."""
+        for limit, delay in sorted(self.retry_delays.items()):
+            if attempt <= limit:
+                return delay
+        return max(self.retry_delays.values()) if self.retry_delays else 0
+
+    async def mark_processed(self, segment):
+        """Marque un segment comme traité et notifie la progression."""
+        segment['processed'] = True
+        self.processed_count += 1
+        self.processed_chars += len(segment['content'])
+        self.session_chars += len(segment['content'])
+        if os.path.exists(segment['output_file']):
+            self.session_bytes += os.path.getsize(segment['output_file'])
+        if self.manifest:
+            # Somme de contrôle éventuelle et écriture du manifeste hors de la boucle
+            await run_io(self.manifest.record_segment, segment)
+        if self.on_progress:
+            self.on_progress(self.progress_state())
+
+    def progress_state(self):
+        """État détaillé de la progression : segments, octets produits, débit et
+        temps restant estimé d'après le modèle de durée et la concurrence courante."""
+        elapsed = time.monotonic() - self.started if self.started else 0
+        chars_per_second = self.session_chars / elapsed if elapsed > 0 else 0
+        remaining_chars = self.total_chars - self.processed_chars
+        if self.analyzing:
+            eta = None  # Le total n'est pas encore connu
+        elif not remaining_chars:
+            eta = 0
+        else:
+            remaining_seconds = self.duration_model.estimate(
+                self.service, self.voice, remaining_chars, self.total_count - self.processed_count
+            )
+            concurrency = int(self.active_limiter.limit) if self.active_limiter else 1
+            eta = round(remaining_seconds / max(1, concurrency))
+        state = {
+            'done': self.processed_count,
+            'total': self.total_count,
+            # Pondéré par les caractères : un long chapitre pèse plus qu'un court
+            'percent': int(self.processed_chars * 100 / self.total_chars) if self.total_chars else 100,
+            'characters_done': self.processed_chars,
+            'characters_total': self.total_chars,
+            'bytes': self.session_bytes,
+            'chars_per_second': round(chars_per_second, 1),
+            'eta': eta,
+            'analyzing': self.analyzing
+        }
+        if self.active_limiter:
+            state.update(self.active_limiter.stats())
+        return state
+
+    def priority(self, segment, voice):
+        """Priorité du segment auprès du limiteur : les plus coûteux d'abord."""
+        return (
+            -self.duration_model.estimate(self.service, voice, len(segment['content'])),
+            -self.duration_model.estimate(self.service, voice, segment.get('chapter_chars', 0))
+        )
+
+    async def convert_segment(self, limiter, segment, voice):
+        """Synthétise un segment avec reprise sur erreur selon `retry_delays`."""
+        text = segment['content']
+        segment.pop('checksum', None)
+        if not text.strip():
+            logging.warning(f"Segment vide ignoré : {segment['title']}")
+            await self.mark_processed(segment)
+            return True
+
+        cache_key = None
+        if self.cache:
+            cache_key = self.cache.make_key(text, voice, service=self.service, **self.prosody)
+            # Copies de fichiers hors de la boucle, comme les écritures des synthèses
+            if await run_io(self.cache.get, cache_key, segment['output_file']):
+                await self.mark_processed(segment)
+                return True
+
+        while segment['attempts'] < self.retry_count:
+            segment['attempts'] += 1
+            started = await limiter.acquire(self.priority(segment, voice))
+            success = False
+            try:
+                synthesis = self.synthesize(text, voice, segment['output_file'], **self.prosody)
+                success = await (asyncio.wait_for(synthesis, self.timeout) if self.timeout else synthesis)
+            except asyncio.TimeoutError:
+                logging.error(f"Délai dépassé pour la synthèse de '{segment['title']}' ({self.timeout}s)")
+            except Exception as e:
+                logging.error(f"Erreur lors de la synthèse de '{segment['title']}': {e}")
+            finally:
+                # L'issue et la latence ajustent la concurrence (voir AdaptiveLimiter)
+                await limiter.release(started, success, len(text))
+
+            if success:
+                self.duration_model.observe(self.service, voice, len(text), time.monotonic() - started)
+                if isinstance(success, str):
+                    segment['checksum'] = success
+                if cache_key:
+                    await run_io(self.cache.put, cache_key, segment['output_file'])
+                await self.mark_processed(segment)
+                return True
+
+            # La pause se fait hors du limiteur pour ne pas bloquer les autres segments
+            delay = self.get_retry_delay(segment['attempts'])
+            logging.warning(
+                f"Échec de '{segment['title']}' (tentative {segment['attempts']}/{self.retry_count}), "
+                f"nouvelle tentative dans {delay}s"
+            )
+            if delay:
+                await asyncio.sleep(delay)
+
+        logging.error(f"Abandon de '{segment['title']}' après {segment['attempts']} tentatives")
+        return False
+
+    def start_session(self, voice):
+        """Remet les compteurs à zéro et renvoie le limiteur de concurrence à utiliser."""
+        self.active_limiter = self.limiter or AdaptiveLimiter(self.batch_size)
+        self.voice = voice
+        self.total_count = self.processed_count = 0
+        self.total_chars = self.processed_chars = 0
+        self.session_chars = 0
+        self.session_bytes = 0
+        self.started = time.monotonic()
+        return self.active_limiter
+
+    async def run(self, segments, voice):
+        """Convertit tous les segments non traités et renvoie le nombre de succès."""
+        limiter = self.start_session(voice)
+        pending = [segment for segment in segments if not segment.get('processed')]
+        self.total_count = len(segments)
+        self.processed_count = self.total_count - len(pending)
+        self.total_chars = sum(len(segment['content']) for segment in segments)
+        self.processed_chars = self.total_chars - sum(len(segment['content']) for segment in pending)
+
+        # Lancés dans l'ordre de priorité : les premières places libres vont aux plus longs
+        pending.sort(key=lambda segment: self.priority(segment, voice))
+        results = await asyncio.gather(
+            *(self.convert_segment(limiter, segment, voice) for segment in pending)
+        )
+        return self.total_count - len(pending) + sum(1 for result in results if result)
+
+    def build_segments(self, chapter, max_chars=DEFAULT_CHUNK_SIZE):
+        """Découpe un chapitre en segments indexés, chacun avec son fichier partiel."""
+        output_file = chapter['output_file']
+        parts_dir = os.path.join(os.path.dirname(output_file), '.segments')
+        stem = os.path.splitext(os.path.basename(output_file))[0]
+        return [
+            {
+                'title': f"{chapter['title']} [{chunk['index'] + 1}]",
+                'index': chunk['index'],
+                'content': chunk['text'],
+                'output_file': os.path.join(parts_dir, f"{stem}_{chunk['index']:04d}.mp3"),
+                'processed': False,
+                'attempts': 0,
+                'chapter_chars': len(chapter['content'])
+            }
+            for chunk in split_text(chapter['content'], max_chars)
+        ]
+
+    def stitch_segments(self, chapter):
+        """Assemble les fichiers partiels d'un chapitre dans l'ordre de leurs index.
+
+        Les trames MPEG sont recopiées en flux, sans réencodage ; les étiquettes
+        ID3 et trames Xing éventuelles des segments sont retirées.
+        """
+        segments = sorted(chapter['segments'], key=lambda segment: segment['index'])
+        with open(chapter['output_file'], 'wb') as output:
+            concatenate_mp3([segment['output_file'] for segment in segments], output)
+        for segment in segments:
+            os.remove(segment['output_file'])
+
+    async def convert_chapters(self, chapters, voice, max_chars=DEFAULT_CHUNK_SIZE):
+        """Découpe les chapitres, synthétise tous les segments en parallèle puis
+        réassemble chaque chapitre. Renvoie le nombre de chapitres convertis."""
+        segments = []
+        for chapter in chapters:
+            # Les segments peuvent déjà exister (reprise depuis un manifeste)
+            if 'segments' not in chapter:
+                chapter['segments'] = self.build_segments(chapter, max_chars)
+            segments.extend(chapter['segments'])
+
+        parts_dir = os.path.dirname(segments[0]['output_file']) if segments else None
+        if parts_dir:
+            os.makedirs(parts_dir, exist_ok=True)
+
+        await self.run(segments, voice)
+
+        successful_chapters = 0
+        for chapter in chapters:
+            if await self.finish_chapter(chapter):
+                successful_chapters += 1
+        self.finish_session(parts_dir)
+        return successful_chapters
+
+    async def finish_chapter(self, chapter):
+        """Assemble le chapitre si tous ses segments sont synthétisés ; renvoie True
+        si le chapitre est converti.
+
+        L'assemblage et le hash du chapitre lisent tout son audio : ils sont faits
+        hors de la boucle pour ne pas retarder les synthèses en cours (ni fausser
+        les latences mesurées par AdaptiveLimiter).
+        """
+        if chapter.get('processed'):
+            return True
+        if not chapter['segments']:
+            logging.warning(f"Chapitre vide ignoré : {chapter['title']}")
+        elif all(segment['processed'] for segment in chapter['segments']):
+            await run_io(self.stitch_segments, chapter)
+            if self.manifest:
+                checksum = await run_io(file_checksum, chapter['output_file'])
+                self.manifest.record_chapter(chapter, checksum)
+        else:
+            return False
+        chapter['processed'] = True
+        return True
+
+    @staticmethod
+    def release_text(chapter):
+        """Libère le texte d'un chapitre converti : seuls son état et les hash de
+        ses segments (pour le manifeste) restent en mémoire."""
+        for segment in chapter['segments']:
+            segment_text_hash(segment)
+            segment['content'] = ''
+        chapter['content'] = ''
+
+    def finish_session(self, parts_dir):
+        self.duration_model.save()
+        if self.manifest:
+            self.manifest.save()
+        if parts_dir and os.path.isdir(parts_dir) and not os.listdir(parts_dir):
+            os.rmdir(parts_dir)
+
+    async def convert_stream(self, chapters, voice, max_chars=DEFAULT_CHUNK_SIZE, max_pending=None):
+        """Convertit les chapitres d'un itérable asynchrone au fil de leur arrivée.
+
+        Les segments d'un chapitre sont lancés dès sa réception, et le chapitre est
+        assemblé dès que ses segments sont prêts, sans attendre la fin de l'analyse.
+        Au plus `max_pending` segments (par défaut deux fois `batch_size`) sont en
+        attente ou en cours : au-delà, la lecture des chapitres suivants est
+        suspendue, ce qui ralentit à son tour l'analyse (voir iterate_in_thread).
+        Le texte d'un chapitre assemblé est libéré (voir release_text).
+        Renvoie le nombre de chapitres convertis.
+        """
+        limiter = self.start_session(voice)
+        pending = asyncio.Semaphore(max_pending or self.batch_size * 2)
+        parts_dir = None
+        chapter_tasks = []
+        segment_tasks = []
+
+        async def convert_queued(segment):
+            try:
+                return await self.convert_segment(limiter, segment, voice)
+            finally:
+                pending.release()
+
+        async def finish_when_done(chapter, tasks):
+            await asyncio.gather(*tasks)
+            finished = await self.finish_chapter(chapter)
+            if finished:
+                self.release_text(chapter)
+            return finished
+
+        self.analyzing = True
+        try:
+            async for chapter in chapters:
+                if 'segments' not in chapter:
+                    chapter['segments'] = self.build_segments(chapter, max_chars)
+                if chapter['segments'] and parts_dir is None:
+                    parts_dir = os.path.dirname(chapter['segments'][0]['output_file'])
+                    os.makedirs(parts_dir, exist_ok=True)
+                self.total_count += len(chapter['segments'])
+                self.total_chars += sum(len(segment['content']) for segment in chapter['segments'])
+
+                tasks = []
+                for segment in chapter['segments']:
+                    await pending.acquire()
+                    tasks.append(asyncio.ensure_future(convert_queued(segment)))
+                segment_tasks.extend(tasks)
+                chapter_tasks.append(asyncio.ensure_future(finish_when_done(chapter, tasks)))
+            self.analyzing = False
+            results = await asyncio.gather(*chapter_tasks)
+        except BaseException:
+            # Analyse en échec ou conversion annulée : aucune synthèse ne doit continuer seule
+            for task in segment_tasks + chapter_tasks:
+                task.cancel()
+            await asyncio.gather(*segment_tasks, *chapter_tasks, return_exceptions=True)
+            raise
+        finally:
+            self.analyzing = False
+
+        self.finish_session(parts_dir)
+        return sum(1 for result in results if result)
+
+
+__all__ = ['ConversionEngine']
@@ -0,0 +1,109 @@
+import json
+import logging
+import os
+import threading
+
+from text_chunker import DEFAULT_CHUNK_SIZE
+
+# Estimation initiale, avant toute mesure pour une voix
+DEFAULT_REQUEST_OVERHEAD = 1.0  # Secondes par requête, quelle que soit sa taille
+DEFAULT_CHARS_PER_SECOND = 200.0
+# Poids de l'estimation initiale face aux mesures (en nombre d'observations)
+PRIOR_WEIGHT = 2.0
+# Oubli appliqué aux anciennes mesures à chaque observation (~50 dernières prépondérantes)
+DEFAULT_DECAY = 0.98
+# Débit maximal admis (évite une pente nulle ou négative)
+MIN_SECONDS_PER_CHAR = 1e-5
+# Version du fichier : les mesures d'un format antérieur sont ignorées
+MODEL_VERSION = 2
+
+
+class DurationModel:
+    """Modèle de la durée d'une synthèse, par moteur et par voix : surcoût +
+    caractères / débit.
+
+    Les deux paramètres sont ajustés par moindres carrés pondérés sur les durées
+    mesurées, les plus récentes comptant davantage, à partir d'une estimation
+    initiale. Les sommes sont conservées dans un fichier JSON (`path`) pour que
+    les conversions suivantes partent du débit déjà appris.
+    """
+
+    def __init__(self, path=None, decay=DEFAULT_DECAY):
+        self.path = str(path) if path else None
+        self.decay = decay
+        self.lock = threading.Lock()
+        # "moteur|voix" -> [poids, Σx, Σy, Σx², Σxy] avec x = caractères, y = secondes
+        self.voices = {}
+        self.dirty = False
+        self.load()
+
+    def load(self):
+        if not self.path:
+            return False
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            voices = data['voices'] if data.get('version') == MODEL_VERSION else {}
+        except FileNotFoundError:
+            return False
+        except (OSError, ValueError, KeyError, AttributeError) as e:
+            logging.warning(f"Modèle de durée illisible {self.path}: {e}")
+            return False
+        with self.lock:
+            self.voices = {voice: [float(value) for value in sums] for voice, sums in voices.items()}
+        return True
+
+    def save(self):
+        """Enregistre les mesures de manière atomique (seulement si elles ont changé)."""
+        if not self.path or not self.dirty:
+            return
+        with self.lock:
+            data = {'version': MODEL_VERSION, 'voices': {voice: list(sums) for voice, sums in self.voices.items()}}
+            self.dirty = False
+        try:
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            temp_path = self.path + '.tmp'
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f)
+            os.replace(temp_path, self.path)
+        except OSError as e:
+            logging.warning(f"Impossible d'enregistrer le modèle de durée: {e}")
+
+    @staticmethod
+    def make_key(service, voice):
+        return f'{service}|{voice}'
+
+    def observe(self, service, voice, chars, seconds):
+        """Ajoute la durée mesurée d'une synthèse de `chars` caractères."""
+        with self.lock:
+            sums = self.voices.setdefault(self.make_key(service, voice), [0.0] * 5)
+            for position, value in enumerate((1.0, chars, seconds, chars * chars, chars * seconds)):
+                sums[position] = sums[position] * self.decay + value
+            self.dirty = True
+
+    def parameters(self, service, voice):
+        """Renvoie `(surcoût en secondes, secondes par caractère)` pour `voice` du moteur `service`."""
+        with self.lock:
+            weight, sx, sy, sxx, sxy = self.voices.get(self.make_key(service, voice), [0.0] * 5)
+        # L'estimation initiale compte comme deux mesures (requête vide, segment par défaut)
+        for chars in (0, DEFAULT_CHUNK_SIZE):
+            seconds = DEFAULT_REQUEST_OVERHEAD + chars / DEFAULT_CHARS_PER_SECOND
+            weight += PRIOR_WEIGHT
+            sx += PRIOR_WEIGHT * chars
+            sy += PRIOR_WEIGHT * seconds
+            sxx += PRIOR_WEIGHT * chars * chars
+            sxy += PRIOR_WEIGHT * chars * seconds
+        slope = max(MIN_SECONDS_PER_CHAR, (weight * sxy - sx * sy) / (weight * sxx - sx * sx))
+        overhead = max(0.0, (sy - slope * sx) / weight)
+        return overhead, slope
+
+    def estimate(self, service, voice, chars, requests=1):
+        """Durée estimée (secondes) de `requests` synthèses totalisant `chars` caractères."""
+        overhead, slope = self.parameters(service, voice)
+        return overhead * requests + slope * chars
+
+    def chars_per_second(self, service, voice):
+        return 1 / self.parameters(service, voice)[1]
+
+
+__all__ = ['DurationModel']
@@ -1,16 +1,149 @@
 import os
 import zipfile
+import contextlib
 import shutil
 import re
-from bs4 import BeautifulSoup
+import posixpath
+from urllib.parse import unquote
+from bs4 import BeautifulSoup, NavigableString
 from PyPDF2 import PdfReader
 from pdfminer.high_level import extract_pages
 from pdfminer.layout import LAParams, LTTextContainer, LTTextLine, LTChar
-import re
-from collections import defaultdict, OrderedDict
+from pdfminer.converter import PDFPageAggregator
+from pdfminer.pdfinterp import PDFPageInterpreter, PDFResourceManager
+from pdfminer.pdfpage import PDFPage
+from collections import Counter, defaultdict, deque
 import logging
 import tempfile
 from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import hashlib
+import heapq
+from text_normalizer import format_lines, split_sections
+
+# Marqueur inséré dans le texte pour découper un document aux ancres des chapitres
+SECTION_MARKER = '\x00'
+
+# Nombre minimal de documents pour lancer l'extraction sur un pool de processus
+PARALLEL_MIN_DOCUMENTS = 16
+# Documents lus et soumis au pool, par processus, en avance sur le consommateur
+PARALLEL_DOCUMENTS_PER_WORKER = 4
+
+# Empreintes de contenu pour la détection des chapitres en double
+SHINGLE_SIZE = 5  # Mots par bardeau
+SKETCH_SIZE = 64  # Plus petites valeurs de hash conservées par esquisse
+CANDIDATE_KEYS = 4  # Valeurs de l'esquisse indexées pour trouver les candidats
+MAX_BUCKET_SIZE = 32  # Au-delà, le bardeau est un texte récurrent, ignoré pour l'indexation
+NEAR_DUPLICATE_THRESHOLD = 0.9  # Similarité de Jaccard estimée minimale
+
+XML_DECLARATION = re.compile(r'^\s*<\?xml[^>]*\?>')
+SINGLE_NEWLINE = re.compile(r'(?<!\n)\n(?!\n)')
+
+
+def iter_lxml_strings(element, fragments):
+    """Parcourt les chaînes d'un arbre lxml dans l'ordre du document, comme
+    `BeautifulSoup.get_text`, en émettant un marqueur avant chaque ancre."""
+    if isinstance(element.tag, str):
+        anchor = element.get('id') or element.get('name')
+        if anchor in fragments:
+            fragments.discard(anchor)
+            yield f'{SECTION_MARKER}{anchor}{SECTION_MARKER}'
+        if element.text and element.tag not in ('script', 'style', 'template'):
+            yield element.text
+        for child in element:
+            yield from iter_lxml_strings(child, fragments)
+    if element.tail:
+        yield element.tail
+
+
+def iter_document_strings(content, fragments=(), parser='html.parser'):
+    """Parcourt les chaînes non vides (sans blancs aux extrémités) d'un document,
+    comme `stripped_strings`, avec un marqueur avant l'élément portant chacune
+    des ancres `fragments`."""
+    # L'analyseur HTML de lxml ignore les sections CDATA, que html.parser conserve
+    if parser == 'lxml' and '<![CDATA[' not in content:
+        import lxml.html
+        root = lxml.html.document_fromstring(XML_DECLARATION.sub('', content, count=1))
+        strings = (text.strip() for text in iter_lxml_strings(root, set(fragments)))
+        return (text for text in strings if text)
+
+    soup = BeautifulSoup(content, 'html.parser')
+    for fragment in fragments:
+        element = soup.find(id=fragment) or soup.find(attrs={'name': fragment})
+        if element is None:
+            continue
+        element.insert_before(NavigableString(f'{SECTION_MARKER}{fragment}{SECTION_MARKER}'))
+    return soup.stripped_strings
+
+
+def get_document_text(content, fragments=(), parser='html.parser'):
+    """Équivalent de `get_text(separator='\\n', strip=True)`, avec un marqueur
+    inséré avant l'élément portant chacune des ancres `fragments`."""
+    return '\n'.join(iter_document_strings(content, fragments, parser))
+
+
+def extract_text(content, parser='html.parser'):
+    text_content = get_document_text(content, parser=parser)
+    return SINGLE_NEWLINE.sub(' ', text_content)  # Merge single newlines
+
+
+def extract_sections(content, fragments, parser='html.parser'):
+    """Découpe le texte d'un document aux ancres `fragments`.
+
+    Renvoie la liste ordonnée des sections `(fragment, texte)` ; la première
+    section (fragment None) contient le texte précédant la première ancre. Les
+    blancs du texte sont normalisés pendant le parcours.
+    """
+    sections = split_sections(iter_document_strings(content, fragments, parser), SECTION_MARKER)
+    found = {fragment for fragment, _ in sections}
+    for fragment in fragments:
+        if fragment not in found:
+            logging.warning(f"Ancre #{fragment} introuvable")
+    return sections
+
+
+def fingerprint_text(text):
+    """Empreinte d'un texte : hash exact, nombre de mots et de bardeaux distincts,
+    et esquisse « bottom-k » des bardeaux de SHINGLE_SIZE mots (valeurs triées)
+    pour estimer la similarité de Jaccard."""
+    words = text.split()
+    exact = hashlib.blake2b(text.strip().encode('utf-8'), digest_size=16).digest()
+    shingles = set(map(hash, zip(*(words[offset:] for offset in range(SHINGLE_SIZE)))))
+    return {
+        'hash': exact,
+        'words': len(words),
+        'shingles': len(shingles),
+        'sketch': heapq.nsmallest(SKETCH_SIZE, shingles)
+    }
+
+
+def fingerprint_similarity(first, second):
+    """Estime la similarité de Jaccard de deux textes à partir de leurs empreintes."""
+    smaller, larger = sorted((first['shingles'], second['shingles']))
+    # La similarité ne peut pas dépasser le rapport des tailles des ensembles
+    if not larger or smaller / larger < NEAR_DUPLICATE_THRESHOLD:
+        return smaller / larger if larger else 0.0
+    first_sketch, second_sketch = set(first['sketch']), set(second['sketch'])
+    union = sorted(first_sketch | second_sketch)[:SKETCH_SIZE]
+    common = first_sketch & second_sketch
+    return sum(1 for value in union if value in common) / len(union)
+
+
+def chapter_number(title):
+    """Premier nombre du titre, clé de tri des chapitres (infini s'il n'y en a pas)."""
+    match = re.search(r'\d+', title)
+    return int(match.group()) if match else float('inf')
+
+
+def extract_document_sections(job):
+    """Point d'entrée des processus d'extraction : `(entrée, contenu, ancres, parser)`."""
+    entry, content, fragments, parser = job
+    try:
+        return entry, extract_sections(content, fragments, parser)
+    except Exception as e:
+        logging.error(f"Erreur lors de la lecture du fichier {entry}: {e}")
+        return entry, [(None, '')]
 
 class EpubProcessor:
     class Chapter:
@@ -18,14 +151,25 @@ class EpubProcessor:
             self.title = title
             self.content_src = content_src
             self.content = content
+            # Chemin complet dans l'archive et ancre, résolus depuis content_src
+            self.href = None
+            self.fragment = None
+            # Empreinte du contenu (voir fingerprint_text), calculée après extraction
+            self.fingerprint = None
 
         def display_chapter_details(self):
             title = self.title if self.title else "Chapitre"
             content = self.content if self.content else "Contenu non disponible"
             print(f"{title} : {content[:100]}")  # Affiche les 100 premiers caractères du contenu
 
-    def __init__(self):
+    def __init__(self, in_memory=True, max_workers=None, parser='html.parser'):
         self.chapters = []
+        # Lecture directe dans l'archive, sans extraction sur disque
+        self.in_memory = in_memory
+        # Nombre de processus pour l'extraction du texte (None : nombre de cœurs)
+        self.max_workers = max_workers
+        # Analyseur HTML : 'html.parser' (référence) ou 'lxml' (plus rapide)
+        self.parser = parser
         # Modèle de titre de chapitre valide
         self.valid_chapter_pattern = re.compile(r'^(?:chapitre|chapter)\s+\d+\.?$', re.IGNORECASE)
 
@@ -36,58 +180,161 @@ class EpubProcessor:
         return bool(self.valid_chapter_pattern.match(clean_title))
 
     def clean_chapters(self, chapters):
-        """Nettoie la liste des chapitres en supprimant les doublons et faux positifs."""
+        """Nettoie la liste des chapitres en supprimant les doublons et faux positifs.
+
+        Les chapitres de contenu identique ou quasi identique (esquisses proches)
+        sont regroupés ; seul le premier au titre valide, à défaut le premier du
+        groupe, est conservé.
+        """
         logging.info("Nettoyage des chapitres détectés")
-        
-        # Grouper les chapitres par nombre de mots
-        chapters_by_words = defaultdict(list)
-        for chapter in chapters:
-            word_count = len(chapter.content.split())
-            chapters_by_words[word_count].append(chapter)
-        
+
+        parents = list(range(len(chapters)))
+
+        def find(index):
+            while parents[index] != index:
+                parents[index] = parents[parents[index]]
+                index = parents[index]
+            return index
+
+        # Regroupement par hash exact, puis par esquisses partageant une petite valeur
+        by_hash = {}
+        buckets = defaultdict(list)
+        for index, chapter in enumerate(chapters):
+            if chapter.fingerprint is None:
+                chapter.fingerprint = fingerprint_text(chapter.content)
+            fingerprint = chapter.fingerprint
+            if fingerprint['hash'] in by_hash:
+                parents[index] = find(by_hash[fingerprint['hash']])
+                continue
+            by_hash[fingerprint['hash']] = index
+
+            for key in fingerprint['sketch'][:CANDIDATE_KEYS]:
+                bucket = buckets[key]
+                if len(bucket) >= MAX_BUCKET_SIZE:
+                    continue
+                for other in bucket:
+                    if find(other) != find(index) and fingerprint_similarity(
+                            fingerprint, chapters[other].fingerprint
+                    ) >= NEAR_DUPLICATE_THRESHOLD:
+                        parents[find(index)] = find(other)
+                bucket.append(index)
+
+        groups = defaultdict(list)
+        for index, chapter in enumerate(chapters):
+            groups[find(index)].append(chapter)
+
         cleaned_chapters = []
-        for word_count, chapter_group in chapters_by_words.items():
+        for chapter_group in groups.values():
             if len(chapter_group) > 1:
-                # S'il y a plusieurs chapitres avec le même nombre de mots
-                logging.warning(f"Chapitres en doublon détectés ({word_count} mots): {[c.title for c in chapter_group]}")
-                
+                logging.warning(f"Chapitres en doublon détectés: {[c.title for c in chapter_group]}")
                 # Garder uniquement le chapitre avec un titre valide
                 valid_chapters = [c for c in chapter_group if self.is_valid_chapter_title(c.title)]
-                
-                if valid_chapters:
-                    cleaned_chapters.extend(valid_chapters)
-                else:
-                    # Si aucun titre valide, prendre le premier par défaut
-                    cleaned_chapters.append(chapter_group[0])
+                if not valid_chapters:
                     logging.warning(f"Aucun titre valide trouvé parmi les doublons: {[c.title for c in chapter_group]}")
+                cleaned_chapters.append(valid_chapters[0] if valid_chapters else chapter_group[0])
             else:
                 cleaned_chapters.append(chapter_group[0])
         
         # Trier les chapitres par numéro
-        def extract_chapter_number(chapter):
-            match = re.search(r'\d+', chapter.title)
-            return int(match.group()) if match else float('inf')
-        
-        cleaned_chapters.sort(key=extract_chapter_number)
+        cleaned_chapters.sort(key=lambda chapter: chapter_number(chapter.title))
         
         return cleaned_chapters
 
-    def extract_metadata(self, epub_path):
+    def read_package(self, zip_ref):
+        """Lit le manifeste et le spine de l'OPF.
+
+        Renvoie un dictionnaire contenant l'index des entrées de l'archive (chemin
+        normalisé -> nom d'entrée), le spine (liste ordonnée d'entrées), le
+        chemin du fichier NCX ainsi que le titre et l'auteur du livre.
+        """
+        names = zip_ref.namelist()
+        href_index = {posixpath.normpath(name): name for name in names}
+        package = {'href_index': href_index, 'spine': [], 'ncx_path': None, 'title': None, 'author': None}
+
+        opf_path = None
+        if 'META-INF/container.xml' in href_index:
+            container = BeautifulSoup(zip_ref.read(href_index['META-INF/container.xml']), 'xml')
+            rootfile = container.find('rootfile')
+            if rootfile and rootfile.get('full-path'):
+                opf_path = posixpath.normpath(unquote(rootfile['full-path']))
+        if opf_path not in href_index:
+            opf_path = next((posixpath.normpath(name) for name in names if name.endswith('.opf')), None)
+
+        if opf_path:
+            opf = BeautifulSoup(zip_ref.read(href_index[opf_path]), 'xml')
+            opf_dir = posixpath.dirname(opf_path)
+            for field, tag in (('title', 'title'), ('author', 'creator')):
+                element = opf.find(tag)
+                if element and element.get_text(strip=True):
+                    package[field] = element.get_text(strip=True)
+            items = {}
+            for item in opf.find_all('item'):
+                if item.get('id') and item.get('href'):
+                    items[item['id']] = (
+                        self.resolve_href(opf_dir, item['href']),
+                        item.get('media-type', '')
+                    )
+
+            spine = opf.find('spine')
+            if spine:
+                for itemref in spine.find_all('itemref'):
+                    href = items.get(itemref.get('idref'), (None, ''))[0]
+                    if href in href_index and itemref.get('linear', 'yes') != 'no':
+                        package['spine'].append(href_index[href])
+                if spine.get('toc') in items:
+                    package['ncx_path'] = items[spine['toc']][0]
+
+            if package['ncx_path'] not in href_index:
+                package['ncx_path'] = next(
+                    (href for href, media_type in items.values() if media_type == 'application/x-dtbncx+xml'),
+                    None
+                )
+        else:
+            logging.warning("Aucun fichier OPF trouvé, résolution des chapitres sans spine")
+
+        if package['ncx_path'] not in href_index:
+            package['ncx_path'] = next((posixpath.normpath(name) for name in names if name.endswith('ncx')), None)
+        return package
+
+    @staticmethod
+    def resolve_href(base_dir, href):
+        """Normalise un lien relatif en chemin complet dans l'archive."""
+        return posixpath.normpath(posixpath.join(base_dir, unquote(href)))
+
+    def read_nav_points(self, zip_ref, package):
         chapters = []
-        with zipfile.ZipFile(epub_path, 'r') as zip_ref:
-            for file in zip_ref.namelist():
-                if file.endswith('ncx'):
-                    with zip_ref.open(file, 'r') as ncx_file:
-                        soup = BeautifulSoup(ncx_file, 'xml')
-                        nav_points = soup.find_all('navPoint')
-                        for nav_point in nav_points:
-                            title = nav_point.find('text').text.strip()
-                            if not title.endswith('.'):
-                                title += '.'
-                            content_src = nav_point.find('content').get('src')
-                            chapters.append(self.Chapter(title, content_src))
+        ncx_path = package['ncx_path']
+        if not ncx_path:
+            logging.warning("Aucun fichier NCX trouvé dans l'ePub")
+            return chapters
+
+        ncx_dir = posixpath.dirname(ncx_path)
+        with zip_ref.open(package['href_index'][ncx_path], 'r') as ncx_file:
+            soup = BeautifulSoup(ncx_file, 'xml')
+            nav_points = soup.find_all('navPoint')
+            for nav_point in nav_points:
+                title = nav_point.find('text').text.strip()
+                if not title.endswith('.'):
+                    title += '.'
+                content_src = nav_point.find('content').get('src')
+                chapter = self.Chapter(title, content_src)
+                if content_src:
+                    path, _, fragment = content_src.partition('#')
+                    chapter.href = self.resolve_href(ncx_dir, path)
+                    chapter.fragment = fragment or None
+                chapters.append(chapter)
         return chapters
 
+    def extract_metadata(self, epub_path):
+        with zipfile.ZipFile(epub_path, 'r') as zip_ref:
+            return self.read_nav_points(zip_ref, self.read_package(zip_ref))
+
+    def extract_book_info(self, epub_path):
+        """Renvoie le titre et l'auteur déclarés dans l'OPF (None s'ils sont absents)"""
+        with zipfile.ZipFile(epub_path, 'r') as zip_ref:
+            package = self.read_package(zip_ref)
+        return {'title': package['title'], 'author': package['author']}
+
     def extract_content_from_archive(self, epub_path):
         # Créer un dossier temporaire unique dans le dossier temp du système
         temp_dir = os.path.join(tempfile.gettempdir(), 'epub_temp_' + str(os.getpid()))
@@ -97,130 +344,386 @@ class EpubProcessor:
             zip_ref.extractall(temp_dir)
         return temp_dir
 
+    def extract_text_from_content(self, content):
+        return extract_text(content, self.parser)
+
     def extract_text_from_file(self, file_path):
         try:
             with open(file_path, 'r', encoding='utf-8') as f:
-                content = f.read()
-                soup = BeautifulSoup(content, 'html.parser')
-                text_content = soup.get_text(separator='\n', strip=True)
-                text_content = re.sub(r'(?<!\n)\n(?!\n)', ' ', text_content)  # Merge single newlines
-                return text_content
+                return self.extract_text_from_content(f.read())
         except Exception as e:
             logging.error(f"Erreur lors de la lecture du fichier {file_path}: {e}")
             return ''
 
-    def analyze_epub(self, epub_path):
-        self.chapters = self.extract_metadata(epub_path)
-        temp_dir = self.extract_content_from_archive(epub_path)
-        text_by_file = {}
+    def extract_sections_from_content(self, content, fragments):
+        return extract_sections(content, fragments, self.parser)
 
-        try:
-            for root, _, files in os.walk(temp_dir):
-                for file in files:
-                    if file.endswith(('.html', '.htm', '.xhtml')):
-                        file_path = os.path.join(root, file)
-                        text_content = self.extract_text_from_file(file_path)
-                        text_by_file[file] = text_content.strip()
-
-            for chapter in self.chapters:
-                content_src = chapter.content_src
-                if content_src:
-                    file_name = os.path.basename(content_src.split('#')[0])
-                    file_candidates = [file for file in text_by_file if file_name in file]
+    def iter_document_sections(self, read_document, documents):
+        """Produit `(entrée, sections)` pour chaque document `(entrée, ancres)`, dans l'ordre.
+
+        Chaque document n'est lu qu'au moment de son extraction. Au-delà de
+        PARALLEL_MIN_DOCUMENTS documents, l'analyse HTML est répartie sur un pool de
+        processus, par lots bornés (PARALLEL_DOCUMENTS_PER_WORKER documents par
+        processus) ; les résultats arrivent dans l'ordre au fil de l'extraction et
+        sont identiques à la version séquentielle.
+        """
+        documents = list(documents)
+
+        def read(entry, fragments):
+            try:
+                return (entry, read_document(entry), fragments, self.parser)
+            except Exception as e:
+                logging.error(f"Erreur lors de la lecture du fichier {entry}: {e}")
+                return (entry, None, fragments, self.parser)
+
+        def extract(job):
+            return (job[0], [(None, '')]) if job[1] is None else extract_document_sections(job)
+
+        unread = iter(documents)
+        # Documents lus, pas encore produits : [job, future (None si illisible)]
+        pending = deque()
+        max_workers = self.max_workers or os.cpu_count() or 1
+        if max_workers > 1 and len(documents) >= PARALLEL_MIN_DOCUMENTS:
+            max_pending = max_workers * PARALLEL_DOCUMENTS_PER_WORKER
+
+            def take():
+                job, future = pending[0]
+                result = extract(job) if future is None else future.result()
+                pending.popleft()
+                return result
 
-                    if file_candidates:
-                        chapter.content = text_by_file.get(file_candidates[0], '')
-                        if len(file_candidates) > 1:
-                            logging.warning(f"Plusieurs fichiers correspondent à content_src {content_src}: {file_candidates}")
-                    else:
-                        logging.warning(f"Aucun fichier ne correspond à content_src {content_src}")
-                        chapter.content = ''
+            try:
+                with ProcessPoolExecutor(max_workers=max_workers) as executor:
+                    for entry, fragments in unread:
+                        pending.append([read(entry, fragments), None])
+                        if pending[-1][0][1] is not None:
+                            pending[-1][1] = executor.submit(extract_document_sections, pending[-1][0])
+                        if len(pending) >= max_pending:
+                            yield take()
+                    while pending:
+                        yield take()
+                return
+            except (OSError, ImportError, NotImplementedError, BrokenProcessPool) as e:
+                # Plateformes sans multiprocessing (Android) : repli séquentiel pour la suite
+                logging.warning(f"Extraction parallèle indisponible ({e}), passage en séquentiel")
+
+        while pending:
+            yield extract(pending.popleft()[0])
+        for entry, fragments in unread:
+            yield extract(read(entry, fragments))
+
+    def extract_all_sections(self, read_document, documents):
+        """Extrait les sections de chaque document `(entrée, ancres)` (voir iter_document_sections)."""
+        return dict(self.iter_document_sections(read_document, documents))
+
+    def iter_resolved_chapters(self, chapters, package, read_document):
+        """Affecte à chaque chapitre son texte en suivant le spine de l'OPF et le
+        produit dès que ce texte est complet.
+
+        Chaque chapitre commence à son document (et à son ancre éventuelle) et se
+        termine au début du chapitre suivant dans l'ordre du spine, en incluant les
+        documents intermédiaires non référencés par la table des matières. Les
+        documents sont lus dans l'ordre : un chapitre est terminé dès que le début
+        du suivant est atteint.
+        """
+        href_index = package['href_index']
+        spine_positions = {entry: position for position, entry in enumerate(package['spine'])}
+
+        # Index de repli par nom de fichier, limité aux noms non ambigus
+        by_basename = defaultdict(list)
+        for href, entry in href_index.items():
+            by_basename[posixpath.basename(href)].append(entry)
+
+        fragments_by_entry = defaultdict(list)
+        chapters_by_entry = defaultdict(list)
+        for chapter in chapters:
+            href = getattr(chapter, 'href', None)
+            if not href:
+                chapter.entry = None
+                continue
+            entry = href_index.get(href)
+            if entry is None:
+                candidates = by_basename.get(posixpath.basename(href), [])
+                if len(candidates) == 1:
+                    entry = candidates[0]
+                else:
+                    logging.warning(f"Aucun fichier ne correspond à content_src {chapter.content_src}")
+            chapter.entry = entry
+            if entry:
+                chapters_by_entry[entry].append(chapter)
+                if chapter.fragment and chapter.fragment not in fragments_by_entry[entry]:
+                    fragments_by_entry[entry].append(chapter.fragment)
 
-                    if not chapter.content.strip():
-                        logging.warning(f"Attention: le chapitre '{chapter.title}' est vide. Vérifiez le fichier source {content_src}.")
+        starts = [chapter.entry for chapter in chapters if chapter.entry]
+        first_position = min((spine_positions[entry] for entry in starts if entry in spine_positions), default=None)
+        entries = set(starts)
+        if first_position is not None:
+            entries.update(package['spine'][first_position:])
 
-                chapter.content = re.sub(r'\s+', ' ', chapter.content).strip()
+        documents = [
+            (entry, fragments_by_entry.get(entry, []))
+            for entry in package['spine'] + sorted(entries - set(package['spine']))
+            if entry in entries
+        ]
 
-            # Nettoyer les chapitres avant de les retourner
-            self.chapters = self.clean_chapters(self.chapters)
+        # Empreintes calculées une seule fois par contenu distinct
+        fingerprints = {}
 
-        finally:
-            shutil.rmtree(temp_dir)
+        def finish(chapter, content):
+            if chapter.entry:
+                chapter.content = content
+            elif chapter.content_src:
+                chapter.content = ''
+            # Texte déjà normalisé par extract_sections
+            if chapter.content_src and not chapter.content:
+                logging.warning(f"Attention: le chapitre '{chapter.title}' est vide. Vérifiez le fichier source {chapter.content_src}.")
+            if chapter.content not in fingerprints:
+                fingerprints[chapter.content] = fingerprint_text(chapter.content)
+            chapter.fingerprint = fingerprints[chapter.content]
+            return chapter
 
+        for chapter in chapters:
+            if not chapter.entry:
+                yield finish(chapter, '')
+
+        # Début de chapitre en cours : textes accumulés et chapitres qui y commencent
+        open_texts, open_chapters = [], []
+        for entry, sections in self.iter_document_sections(read_document, documents):
+            in_spine = entry in spine_positions
+            if not in_spine and open_chapters and open_chapters[0].entry in spine_positions:
+                # Les documents hors spine ne prolongent pas les chapitres du spine
+                for chapter in open_chapters:
+                    yield finish(chapter, ' '.join(text for text in open_texts if text))
+                open_texts, open_chapters = [], []
+
+            texts = [text for _, text in sections]
+            fragment_ids = [fragment for fragment, _ in sections]
+            starting = defaultdict(list)
+            for chapter in chapters_by_entry.get(entry, []):
+                index = fragment_ids.index(chapter.fragment) if chapter.fragment in fragment_ids else 0
+                starting[index].append(chapter)
+
+            boundaries = sorted(starting)
+            open_texts.extend(texts[:boundaries[0]] if boundaries else texts)
+            for position, index in enumerate(boundaries):
+                for chapter in open_chapters:
+                    yield finish(chapter, ' '.join(text for text in open_texts if text))
+                end = boundaries[position + 1] if position + 1 < len(boundaries) else len(texts)
+                open_texts, open_chapters = texts[index:end], starting[index]
+
+            if not in_spine:
+                for chapter in open_chapters:
+                    yield finish(chapter, ' '.join(text for text in open_texts if text))
+                open_texts, open_chapters = [], []
+
+        for chapter in open_chapters:
+            yield finish(chapter, ' '.join(text for text in open_texts if text))
+
+    def resolve_chapter_contents(self, chapters, package, read_document):
+        """Affecte à chaque chapitre son texte (voir iter_resolved_chapters)."""
+        for _ in self.iter_resolved_chapters(chapters, package, read_document):
+            pass
+
+    @contextlib.contextmanager
+    def open_book(self, epub_path):
+        """Ouvre l'ePub et fournit `(package, chapitres de la table des matières, read_document)`."""
+        with zipfile.ZipFile(epub_path, 'r') as zip_ref:
+            package = self.read_package(zip_ref)
+            chapters = self.read_nav_points(zip_ref, package)
+
+            if self.in_memory:
+                # Lecture directe dans l'archive des seuls documents nécessaires
+                yield package, chapters, lambda entry: zip_ref.read(entry).decode('utf-8')
+            else:
+                temp_dir = self.extract_content_from_archive(epub_path)
+                try:
+                    def read_document(entry):
+                        with open(os.path.join(temp_dir, entry), 'r', encoding='utf-8') as f:
+                            return f.read()
+
+                    yield package, chapters, read_document
+                finally:
+                    shutil.rmtree(temp_dir)
+
+    def analyze_epub(self, epub_path):
+        with self.open_book(epub_path) as (package, chapters, read_document):
+            self.resolve_chapter_contents(chapters, package, read_document)
+
+        # Nettoyer les chapitres avant de les retourner
+        self.chapters = self.clean_chapters(chapters)
         return self.chapters
 
-import re
+    def iter_epub_chapters(self, epub_path, report=None):
+        """Produit les chapitres au fil de l'extraction, dans l'ordre final (par numéro).
+
+        Un chapitre est produit dès que son texte et celui des chapitres qui le
+        précèdent sont complets ; les doublons d'un chapitre déjà produit sont
+        ignorés. Si un doublon est trouvé, le chapitre retenu peut différer de
+        celui de clean_chapters (qui préfère un titre valide) : `report['exact']`
+        vaut alors False, True si le résultat est identique à analyze_epub.
+        """
+        if report is None:
+            report = {}
+        report['exact'] = True
+        by_hash = set()
+        buckets = defaultdict(list)
+
+        def is_duplicate(chapter):
+            fingerprint = chapter.fingerprint
+            if fingerprint['hash'] in by_hash:
+                return True
+            keys = fingerprint['sketch'][:CANDIDATE_KEYS]
+            for key in keys:
+                bucket = buckets[key]
+                if len(bucket) >= MAX_BUCKET_SIZE:
+                    report['exact'] = False
+                    continue
+                for other in bucket:
+                    if fingerprint_similarity(fingerprint, other.fingerprint) >= NEAR_DUPLICATE_THRESHOLD:
+                        return True
+            by_hash.add(fingerprint['hash'])
+            for key in keys:
+                if len(buckets[key]) < MAX_BUCKET_SIZE:
+                    buckets[key].append(chapter)
+            return False
+
+        with self.open_book(epub_path) as (package, chapters, read_document):
+            # Rang de chaque chapitre dans l'ordre final (tri stable par numéro, comme clean_chapters)
+            order = sorted(range(len(chapters)), key=lambda index: chapter_number(chapters[index].title))
+            ranks = {id(chapters[index]): rank for rank, index in enumerate(order)}
+            ready = {}
+            next_rank = 0
+            for chapter in self.iter_resolved_chapters(chapters, package, read_document):
+                ready[ranks[id(chapter)]] = chapter
+                while next_rank in ready:
+                    candidate = ready.pop(next_rank)
+                    next_rank += 1
+                    if is_duplicate(candidate):
+                        logging.warning(f"Chapitre en doublon ignoré: {candidate.title}")
+                        report['exact'] = False
+                        continue
+                    yield candidate
+
 
 def clean_and_format_text(text):
-    # Supprimer les sauts de ligne multiples
-    text = re.sub(r'\n{2,}', '\n\n', text)
-    
-    # Joindre les lignes qui ne se terminent pas par un point, sauf si la ligne suivante commence par une majuscule
-    lines = text.split('\n')
-    formatted_lines = []
-    
-    for i, line in enumerate(lines):
-        line = line.strip()
-        if not line:
-            continue
-        if i < len(lines) - 1:
-            next_line = lines[i + 1].strip()
-            if not line.endswith(('.', '!', '?', ':', '"', "'")) and (not next_line or not next_line[0].isupper()):
-                formatted_lines.append(line + ' ')
-            else:
-                formatted_lines.append(line + '\n')
-        else:
-            formatted_lines.append(line)
-    
-    formatted_text = ''.join(formatted_lines)
-    
-    # Supprimer les espaces multiples
-    formatted_text = re.sub(r' {2,}', ' ', formatted_text)
-    
-    return formatted_text.strip()
+    # Fusion des lignes, suppression des lignes vides et des espaces multiples (voir format_lines)
+    return format_lines([text])
+
+# Nombre minimal de pages par lot pour l'extraction PDF parallèle
+PDF_MIN_PAGES_PER_SHARD = 8
+
+
+def iter_layout_lines(page_layout):
+    """Produit les lignes `(texte, taille de police)` d'une page analysée."""
+    for element in page_layout:
+        if isinstance(element, LTTextContainer):
+            for text_line in element:
+                if isinstance(text_line, LTTextLine):
+                    line_text = text_line.get_text().strip()
+                    font_sizes = [char.size for char in text_line if isinstance(char, LTChar)]
+                    if font_sizes:
+                        max_font_size = max(font_sizes)
+                        yield line_text, max_font_size
+
+
+def extract_text_and_fonts_from_pages(pdf_path, page_numbers=None):
+    """Extrait les lignes `(texte, taille de police)` des pages `page_numbers`
+    (toutes les pages si None), dans l'ordre du document."""
+    laparams = LAParams()
+    text_content = []
+
+    # Extract text and font information from each page
+    for page_layout in extract_pages(pdf_path, page_numbers=page_numbers, laparams=laparams):
+        text_content.extend(iter_layout_lines(page_layout))
+
+    return text_content
+
+
+def extract_pdf_shard(job):
+    """Point d'entrée des processus d'extraction PDF : `(chemin, première page, dernière page)`."""
+    pdf_path, start, end = job
+    return extract_text_and_fonts_from_pages(pdf_path, range(start, end))
+
 
 class PdfProcessor:
-    def __init__(self):
-        pass
-
-    def extract_text_and_fonts_from_pdf(self, pdf_path):
-        laparams = LAParams()
-        text_content = []
-
-        # Extract text and font information from each page
-        for page_layout in extract_pages(pdf_path, laparams=laparams):
-            for element in page_layout:
-                if isinstance(element, LTTextContainer):
-                    for text_line in element:
-                        if isinstance(text_line, LTTextLine):
-                            line_text = text_line.get_text().strip()
-                            font_sizes = [char.size for char in text_line if isinstance(char, LTChar)]
-                            if font_sizes:
-                                max_font_size = max(font_sizes)
-                                text_content.append((line_text, max_font_size))
-
-        return text_content
+    def __init__(self, max_workers=None, streaming=False):
+        # Nombre de processus pour l'extraction (None : nombre de cœurs)
+        self.max_workers = max_workers
+        # Détection en flux, à mémoire bornée (appareils avec peu de RAM)
+        self.streaming = streaming
 
-    def detect_chapters(self, text_content):
-        chapters = []
-        chapter_pattern = re.compile(r'^(Chapter|Chapitre|Part|Section|Titre)\s+\d+.*$', re.IGNORECASE)
-        
+    def count_pages(self, pdf_path):
+        return len(PdfReader(pdf_path).pages)
+
+    def extract_text_and_fonts_from_pdf(self, pdf_path, max_workers=None):
+        """Extrait les lignes `(texte, taille de police)` du PDF.
+
+        Les pages sont réparties par plages sur un pool de processus, puis les
+        résultats sont fusionnés dans l'ordre des pages.
+        """
+        max_workers = max_workers or self.max_workers or os.cpu_count() or 1
+        if max_workers > 1:
+            try:
+                page_count = self.count_pages(pdf_path)
+            except Exception as e:
+                logging.warning(f"Impossible de compter les pages de {pdf_path} ({e}), extraction séquentielle")
+                page_count = 0
+
+            if page_count >= 2 * PDF_MIN_PAGES_PER_SHARD:
+                shard_size = max(PDF_MIN_PAGES_PER_SHARD, -(-page_count // (max_workers * 4)))
+                jobs = [
+                    (pdf_path, start, min(start + shard_size, page_count))
+                    for start in range(0, page_count, shard_size)
+                ]
+                try:
+                    with ProcessPoolExecutor(max_workers=min(max_workers, len(jobs))) as executor:
+                        text_content = []
+                        for shard in executor.map(extract_pdf_shard, jobs):
+                            text_content.extend(shard)
+                        return text_content
+                except (OSError, ImportError, NotImplementedError, BrokenProcessPool) as e:
+                    # Plateformes sans multiprocessing (Android) : repli séquentiel
+                    logging.warning(f"Extraction parallèle indisponible ({e}), passage en séquentiel")
+
+        return extract_text_and_fonts_from_pages(pdf_path)
+
+    chapter_pattern = re.compile(r'^(Chapter|Chapitre|Part|Section|Titre)\s+\d+.*$', re.IGNORECASE)
+
+    def collect_font_histograms(self, pdf_path):
+        """Première passe, légère : histogramme des tailles de police par page.
+
+        Sans analyse de mise en page (`laparams=None`), seuls les caractères sont
+        lus ; rien d'autre n'est conservé en mémoire.
+        """
+        resource_manager = PDFResourceManager()
+        device = PDFPageAggregator(resource_manager, laparams=None)
+        interpreter = PDFPageInterpreter(resource_manager, device)
+        histograms = []
+        with open(pdf_path, 'rb') as pdf_file:
+            for page in PDFPage.get_pages(pdf_file):
+                interpreter.process_page(page)
+                histograms.append(Counter(
+                    element.size for element in device.get_result() if isinstance(element, LTChar)
+                ))
+        return histograms
+
+    def iter_text_and_fonts(self, pdf_path):
+        """Parcourt les lignes `(texte, taille de police)` du PDF page par page."""
+        # extract_pages est un générateur : une seule page est analysée à la fois
+        for page_layout in extract_pages(pdf_path, laparams=LAParams()):
+            yield from iter_layout_lines(page_layout)
+
+    def iter_chapters(self, text_lines, title_font_size_threshold):
+        """Regroupe un flux de lignes en chapitres, produits un par un."""
         current_chapter = None
         chapter_content = []
 
-        # Define a threshold for font size to consider it as a chapter title
-        if text_content:
-            title_font_size_threshold = max(font_size for _, font_size in text_content) * 0.9
-        else:
-            title_font_size_threshold = 0
-
-        for line, font_size in text_content:
-            if chapter_pattern.match(line) or font_size >= title_font_size_threshold:
+        for line, font_size in text_lines:
+            if self.chapter_pattern.match(line) or font_size >= title_font_size_threshold:
                 if current_chapter:
-                    chapter_text = '\n'.join(chapter_content)
-                    # Appliquer le nettoyage et la mise en forme ici
-                    chapter_text = clean_and_format_text(chapter_text)
-                    chapters.append({'title': current_chapter, 'content': chapter_text})
+                    # Nettoyage et mise en forme en une passe sur les lignes
+                    chapter_text = format_lines(chapter_content)
+                    yield {'title': current_chapter, 'content': chapter_text}
                     chapter_content = []
                 current_chapter = line
             else:
@@ -229,18 +732,58 @@ class PdfProcessor:
 
         # Add the last chapter
         if current_chapter:
-            chapter_text = '\n'.join(chapter_content)
-            # Appliquer le nettoyage et la mise en forme ici
-            chapter_text = clean_and_format_text(chapter_text)
-            chapters.append({'title': current_chapter, 'content': chapter_text})
+            # Nettoyage et mise en forme en une passe sur les lignes
+            chapter_text = format_lines(chapter_content)
+            yield {'title': current_chapter, 'content': chapter_text}
+
+    def detect_chapters(self, text_content):
+        # Define a threshold for font size to consider it as a chapter title
+        if text_content:
+            title_font_size_threshold = max(font_size for _, font_size in text_content) * 0.9
+        else:
+            title_font_size_threshold = 0
+
+        chapters = list(self.iter_chapters(text_content, title_font_size_threshold))
 
         if not chapters:
             print("Aucun chapitre détecté. Vérifiez l'expression régulière ou la structure du texte.")
         
         return chapters
 
-    def analyze_pdf(self, pdf_path):
-        text_content = self.extract_text_and_fonts_from_pdf(pdf_path)
+    def iter_pdf_chapters(self, pdf_path):
+        """Détection des chapitres en deux passes, à mémoire bornée.
+
+        La première passe ne calcule que l'histogramme des tailles de police ; la
+        seconde relit le document page par page et produit les chapitres au fur et
+        à mesure, sans jamais garder le texte complet du livre en mémoire.
+        """
+        histograms = self.collect_font_histograms(pdf_path)
+        max_font_size = max((max(histogram) for histogram in histograms if histogram), default=0)
+        title_font_size_threshold = max_font_size * 0.9
+
+        detected = False
+        for chapter in self.iter_chapters(self.iter_text_and_fonts(pdf_path), title_font_size_threshold):
+            detected = True
+            yield chapter
+
+        if not detected:
+            print("Aucun chapitre détecté. Vérifiez l'expression régulière ou la structure du texte.")
+
+    def extract_book_info(self, pdf_path):
+        """Renvoie le titre et l'auteur des métadonnées du PDF (None s'ils sont absents)"""
+        try:
+            metadata = PdfReader(pdf_path).metadata
+        except Exception as e:
+            logging.warning(f"Métadonnées illisibles {pdf_path}: {e}")
+            metadata = None
+        if not metadata:
+            return {'title': None, 'author': None}
+        return {'title': metadata.title or None, 'author': metadata.author or None}
+
+    def analyze_pdf(self, pdf_path, max_workers=None):
+        if self.streaming:
+            return list(self.iter_pdf_chapters(pdf_path))
+        text_content = self.extract_text_and_fonts_from_pdf(pdf_path, max_workers)
         return self.detect_chapters(text_content)
 
 def clean_tmp():
@@ -0,0 +1,158 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+
+MANIFEST_NAME = '.job_manifest.json'
+MANIFEST_VERSION = 1
+
+
+def file_checksum(path, block_size=1024 * 1024):
+    """Calcule le sha256 d'un fichier par blocs."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def segment_text_hash(segment):
+    """Renvoie (et mémorise) le hash du texte d'un segment."""
+    if 'text_hash' not in segment:
+        segment['text_hash'] = hashlib.sha256(segment['content'].encode('utf-8')).hexdigest()
+    return segment['text_hash']
+
+
+class JobManifest:
+    """Manifeste persistant d'une conversion, écrit dans le dossier de sortie.
+
+    Il contient le hash du livre, les chapitres et leurs segments avec leur état
+    et la somme de contrôle des fichiers produits. Il est mis à jour au fil de la
+    conversion pour permettre une reprise après un arrêt brutal.
+    """
+
+    def __init__(self, output_dir, save_interval=1.0):
+        self.path = os.path.join(str(output_dir), MANIFEST_NAME)
+        self.save_interval = save_interval
+        self.data = None
+        self.chapters = []
+        self.last_save = 0
+        self.lock = threading.Lock()
+
+    def load(self):
+        """Charge le manifeste existant. Renvoie False s'il est absent ou illisible."""
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return False
+        except (OSError, ValueError) as e:
+            logging.error(f"Manifeste illisible {self.path}: {e}")
+            return False
+
+        if data.get('version') != MANIFEST_VERSION:
+            logging.warning(f"Version de manifeste non supportée: {data.get('version')}")
+            return False
+        self.data = data
+        return True
+
+    def start(self, file_path, settings, chapters):
+        """Initialise un nouveau manifeste pour `chapters` (avec leurs segments)."""
+        self.data = {
+            'version': MANIFEST_VERSION,
+            'file_path': str(file_path),
+            'book_hash': file_checksum(file_path),
+            'settings': settings,
+            'chapters': []
+        }
+        self.chapters = chapters
+        self.save()
+
+    def matches(self, file_path, settings):
+        """Vérifie que le manifeste chargé correspond au même livre et aux mêmes réglages."""
+        if not self.data:
+            return False
+        return self.data['book_hash'] == file_checksum(file_path) and self.data['settings'] == settings
+
+    def restore(self, chapters):
+        """Reporte l'état enregistré sur des chapitres fraîchement découpés.
+
+        Un segment n'est considéré comme terminé que si son texte est identique et
+        que son fichier existe avec la somme de contrôle enregistrée.
+        """
+        saved_chapters = {chapter['output_file']: chapter for chapter in self.data['chapters']}
+        for chapter in chapters:
+            saved = saved_chapters.get(chapter['output_file'])
+            if not saved:
+                continue
+
+            if saved['processed'] and self._is_valid(chapter['output_file'], saved.get('checksum')):
+                chapter['processed'] = True
+                chapter['checksum'] = saved['checksum']
+                for segment in chapter['segments']:
+                    segment['processed'] = True
+                continue
+
+            saved_segments = {segment['index']: segment for segment in saved['segments']}
+            for segment in chapter['segments']:
+                saved_segment = saved_segments.get(segment['index'])
+                if (saved_segment and saved_segment['processed']
+                        and saved_segment['text_hash'] == segment_text_hash(segment)
+                        and self._is_valid(segment['output_file'], saved_segment.get('checksum'))):
+                    segment['processed'] = True
+                    segment['checksum'] = saved_segment['checksum']
+
+        self.chapters = chapters
+
+    @staticmethod
+    def _is_valid(path, checksum):
+        return bool(checksum) and os.path.exists(path) and file_checksum(path) == checksum
+
+    def record_segment(self, segment):
+        # Somme de contrôle déjà calculée pendant l'écriture (voir PartFileWriter)
+        if not segment.get('checksum') and os.path.exists(segment['output_file']):
+            segment['checksum'] = file_checksum(segment['output_file'])
+        self.save(force=False)
+
+    def record_chapter(self, chapter, checksum=None):
+        chapter['checksum'] = checksum or file_checksum(chapter['output_file'])
+        # Les fichiers des segments viennent d'être supprimés : enregistré sans attendre
+        self.save()
+
+    def save(self, force=True):
+        """Écrit le manifeste de manière atomique (au plus une fois par `save_interval`)."""
+        # Appelé depuis les threads du pool des fichiers audio (voir ConversionEngine)
+        with self.lock:
+            now = time.monotonic()
+            if not force and now - self.last_save < self.save_interval:
+                return
+            self.last_save = now
+
+            self.data['chapters'] = [
+                {
+                    'title': chapter['title'],
+                    'output_file': chapter['output_file'],
+                    'processed': chapter.get('processed', False),
+                    'checksum': chapter.get('checksum'),
+                    'segments': [
+                        {
+                            'index': segment['index'],
+                            'output_file': segment['output_file'],
+                            'text_hash': segment_text_hash(segment),
+                            'processed': segment['processed'],
+                            'checksum': segment.get('checksum')
+                        }
+                        for segment in chapter.get('segments', [])
+                    ]
+                }
+                for chapter in self.chapters
+            ]
+            temp_path = self.path + '.tmp'
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump(self.data, f, ensure_ascii=False)
+            os.replace(temp_path, self.path)
+
+
+__all__ = ['JobManifest', 'file_checksum']
@@ -1,6 +1,10 @@
+import time
+
+# Instant de démarrage, avant tout import coûteux (mesure du délai d'affichage)
+STARTUP_TIME = time.perf_counter()
+
 import os
 import sys
-import time
 import json
 import asyncio
 import platform as sys_platform
@@ -10,9 +14,21 @@ from threading import Thread
 from pathlib import Path
 from functools import partial
 
-import webview
-import edge_tts
-from epub_processor import EpubProcessor, PdfProcessor, clean_tmp
+# webview, edge_tts et les processeurs ePub/PDF (BeautifulSoup, pdfminer, PyPDF2)
+# sont importés à la première utilisation pour accélérer le démarrage
+from conversion_engine import ConversionEngine
+from text_chunker import DEFAULT_CHUNK_SIZE
+from synthesis_cache import SynthesisCache
+from job_manifest import JobManifest
+from voice_catalog import VoiceCatalog
+from async_runtime import AsyncRuntime, iterate_in_thread
+from analysis_cache import AnalysisCache
+from audio_assembly import assemble_book
+from progress_bus import ProgressBus
+from concurrency_limiter import AdaptiveLimiter
+from duration_model import DurationModel
+from tts_backends import BACKENDS, create_backend
+from audio_writer import ByteBudget
 
 # Imports pour Android
 platform = sys_platform.system().lower()
@@ -29,37 +45,62 @@ if is_android:
     Context = autoclass('android.content.Context')
     DocumentFile = autoclass('androidx.documentfile.provider.DocumentFile')
 
+# Débit de lecture moyen d'une voix TTS à vitesse normale (mots par minute)
+WORDS_PER_MINUTE = 150
+# Taille (caractères) d'une page de texte envoyée à l'aperçu
+CHAPTER_PAGE_SIZE = 20000
+
+# Mesures de démarrage, en secondes depuis STARTUP_TIME
+STARTUP_METRICS = {'modules_loaded': time.perf_counter() - STARTUP_TIME}
+
 class ApiInterface:
     def __init__(self):
-        # Initialisation des processeurs pour ePub et PDF
-        self.epub_processor = EpubProcessor()
-        self.pdf_processor = PdfProcessor()
+        # Les processeurs pour ePub et PDF sont créés à la première utilisation
+        self._epub_processor = None
+        self._pdf_processor = None
         self.is_android = platform == 'android'
         
         if self.is_android:
             self.ensure_permissions()
-            self.android_voices = self.get_android_tts_voices()
-        else:
-            self.android_voices = []
+        # Voix Android chargées à la première demande, pas au démarrage
+        self.android_voices = []
 
-        # Initialisation de la boucle asyncio
-        if not platform == 'android':
-            try:
-                self.loop = asyncio.get_event_loop()
-            except RuntimeError:
-                self.loop = asyncio.new_event_loop()
-                asyncio.set_event_loop(self.loop)
-                print('Boucle asyncio initialisée')
+        # Boucle asyncio unique, dans un thread dédié, partagée par tous les appels
+        self.runtime = AsyncRuntime()
+        # Moteurs de synthèse (voir tts_backends.py), créés à la première utilisation
+        self.backends = {}
+        # Audio reçu en attente d'écriture, plafonné pour tous les moteurs et toutes les conversions
+        self.byte_budget = ByteBudget()
 
         self.context = None
         if platform == 'android':
             self.context = autoclass('org.kivy.android.PythonActivity').mActivity
         else:
-            self.context = webview.windows[0] if webview.windows else None
+            # Sans module webview chargé (mode sans interface), il n'y a pas de fenêtre
+            webview = sys.modules.get('webview')
+            self.context = webview.windows[0] if webview and webview.windows else None
 
         # Paramètres par défaut pour le traitement par lots
-        self.batch_size = 5
+        self.batch_size = 5  # Limite haute : la concurrence réelle s'adapte (AdaptiveLimiter)
         self.retry_count = 20
+        self.synthesis_timeout = 120  # Secondes avant d'abandonner une synthèse
+        self.chunk_size = DEFAULT_CHUNK_SIZE  # Taille max (caractères) d'un segment TTS
+        self.rate = '+0%'
+        self.pitch = '+0Hz'
+        # Produire aussi un fichier unique du livre avec marqueurs de chapitres
+        self.single_file = False
+
+        # Catalogue des voix Edge : instantané local, rafraîchi en arrière-plan à la
+        # première utilisation d'Edge (aucun accès réseau pour les moteurs hors ligne)
+        self.voice_catalog = VoiceCatalog(
+            Path.home() / '.audiobookgen' / 'edge_voices.json',
+            self.fetch_edge_voices,
+            run=self.runtime.run
+        )
+        # Chapitres déjà extraits, réutilisés par l'aperçu et la conversion
+        self.analysis_cache = AnalysisCache(Path.home() / '.audiobookgen' / 'analysis')
+        # Durée des synthèses par moteur et par voix, apprise d'une conversion à l'autre (ordre et temps restant)
+        self.duration_model = DurationModel(Path.home() / '.audiobookgen' / 'synthesis_durations.json')
         self.retry_delays = {
             10: 0,      # Pas de pause jusqu'à 10 tentatives
             20: 30,     # 30 secondes de pause entre 10-20
@@ -68,6 +109,26 @@ class ApiInterface:
             50: 120     # 2 minutes entre 40-50
         }
 
+    def _get_epub_processor(self):
+        """Crée le processeur ePub à la première utilisation"""
+        if self._epub_processor is None:
+            from epub_processor import EpubProcessor
+            # Pas de pool de processus sur Android : extraction séquentielle
+            self._epub_processor = EpubProcessor(max_workers=1 if is_android else None)
+        return self._epub_processor
+
+    def _get_pdf_processor(self):
+        """Crée le processeur PDF à la première utilisation"""
+        if self._pdf_processor is None:
+            from epub_processor import PdfProcessor
+            # Détection des chapitres PDF en flux sur Android (mémoire limitée)
+            self._pdf_processor = PdfProcessor(max_workers=1 if is_android else None, streaming=is_android)
+        return self._pdf_processor
+
+    def get_startup_metrics(self):
+        """Renvoie les mesures de démarrage (secondes depuis le lancement)"""
+        return {'status': 'success', 'metrics': dict(STARTUP_METRICS)}
+
     def ensure_permissions(self):
         """Vérifie et demande les permissions nécessaires"""
         required_permissions = [
@@ -162,6 +223,7 @@ class ApiInterface:
             print(f'Dossier par défaut: {default_path}')
             
             # Créer le dialogue de sélection
+            import webview
             result = webview.windows[0].create_file_dialog(
                 webview.OPEN_DIALOG,
                 directory=default_path,
@@ -244,6 +306,7 @@ class ApiInterface:
             print(f'Dossier par défaut: {default_path}')
             
             # Créer le dialogue de sélection
+            import webview
             result = webview.windows[0].create_file_dialog(
                 webview.FOLDER_DIALOG,
                 directory=default_path
@@ -419,31 +482,44 @@ class ApiInterface:
         except Exception as e:
             return {'status': 'error', 'message': str(e)}
 
-    async def get_edge_voices(self):
-        """Récupère la liste des voix edge-tts de manière asynchrone"""
+    def get_backend(self, service):
+        """Renvoie le moteur de synthèse `service` (ValueError s'il est inconnu)"""
+        if service not in self.backends:
+            options = {'get_connector': self.runtime.get_connector} if service == 'edge' else {}
+            self.backends[service] = create_backend(service, byte_budget=self.byte_budget, **options)
+            if service == 'edge' and not self.is_android and self.voice_catalog.is_expired():
+                # Après l'enregistrement du moteur : le rafraîchissement le réutilise
+                self.voice_catalog.refresh_in_background()
+        return self.backends[service]
+
+    async def fetch_edge_voices(self):
+        """Télécharge le catalogue complet des voix edge-tts"""
+        return await self.get_backend('edge').fetch_voices()
+
+    def get_edge_voices(self):
+        """Récupère la liste des voix edge-tts depuis le catalogue local"""
         try:
             print('Récupération des voix edge-tts...')
-            voices = await edge_tts.list_voices()
-            print(f'Structure d\'une voix: {voices[0] if voices else "Aucune voix trouvée"}')
+            voices = self.voice_catalog.get_voices('fr')
+            print(f'Voix lues depuis le catalogue (mis à jour le {time.ctime(self.voice_catalog.fetched_at)})')
             
-            # Filtrer les voix françaises et créer un mapping des noms courts
+            # Créer la liste des voix françaises et un mapping des noms courts
             fr_voices = []
             voice_mapping = {}
             
             for voice in voices:
-                if voice['Locale'].startswith('fr'):
-                    voice_info = {
-                        'id': voice['ShortName'],
-                        'name': voice['FriendlyName'],
-                        'locale': voice['Locale'],
-                        'gender': voice['Gender']
-                    }
-                    fr_voices.append(voice_info)
-                    
-                    # Créer un mapping pour les versions non-multilingues
-                    if 'Multilingual' in voice['ShortName']:
-                        base_name = voice['ShortName'].replace('Multilingual', '')
-                        voice_mapping[base_name] = voice['ShortName']
+                voice_info = {
+                    'id': voice['ShortName'],
+                    'name': voice['FriendlyName'],
+                    'locale': voice['Locale'],
+                    'gender': voice['Gender']
+                }
+                fr_voices.append(voice_info)
+                
+                # Créer un mapping pour les versions non-multilingues
+                if 'Multilingual' in voice['ShortName']:
+                    base_name = voice['ShortName'].replace('Multilingual', '')
+                    voice_mapping[base_name] = voice['ShortName']
             
             print(f'Voix françaises trouvées: {len(fr_voices)}')
             for voice in fr_voices:
@@ -477,18 +553,22 @@ class ApiInterface:
 
             if service == 'edge':
                 if not platform == 'android':
-                    # Exécuter de manière asynchrone
-                    loop = asyncio.new_event_loop()
-                    asyncio.set_event_loop(loop)
-                    result = loop.run_until_complete(self.get_edge_voices())
-                    loop.close()
+                    result = self.get_edge_voices()
                     print('Récupération des voix terminée')
                     return result
                 else:
                     return {'status': 'error', 'message': 'Edge TTS non disponible sur Android'}
             elif service == 'google' and self.is_android:
-                voices = self.get_android_tts_voices()
-                return {'status': 'success', 'voices': voices}
+                if not self.android_voices:
+                    self.android_voices = self.get_android_tts_voices()
+                return {'status': 'success', 'voices': self.android_voices}
+            elif service in BACKENDS:
+                backend = self.get_backend(service)
+                if not backend.is_available():
+                    return {'status': 'error', 'message': f'{backend.label} non disponible sur cet appareil'}
+                voices = self.runtime.run(backend.list_voices('fr'))
+                print(f'Voix trouvées ({backend.label}): {len(voices)}')
+                return {'status': 'success', 'voices': voices, 'default': backend.default_voice}
             else:
                 return {'status': 'error', 'message': 'Service non supporté'}
         except Exception as e:
@@ -498,15 +578,9 @@ class ApiInterface:
             print('FIN DE LA RÉCUPÉRATION DES VOIX')
             print('='*50)
 
-    async def do_tts(self, text, voice, output_file):
-        """Effectue la synthèse vocale de manière asynchrone"""
-        try:
-            communicate = edge_tts.Communicate(text, voice)
-            await communicate.save(output_file)
-            return True
-        except Exception as e:
-            print(f'Erreur lors de la synthèse vocale: {str(e)}')
-            return False
+    async def do_tts(self, text, voice, output_file, rate='+0%', pitch='+0Hz'):
+        """Effectue la synthèse vocale Edge de manière asynchrone"""
+        return await self.get_backend('edge').synthesize(text, voice, output_file, rate=rate, pitch=pitch)
 
     def test_voice(self, service, voice=None):
         """Teste la voix sélectionnée"""
@@ -524,25 +598,30 @@ class ApiInterface:
         temp_file = None
         
         try:
-            if service == 'edge':
-                if self.is_android:
+            if service in BACKENDS:
+                if service == 'edge' and self.is_android:
                     return {'status': 'error', 'message': 'Edge TTS non disponible sur Android'}
                 
-                print('Initialisation du service Edge TTS')
-                print('Module edge-tts trouvé et importé')
-                print(f'[Version edge-tts] {edge_tts.__version__}')
+                backend = self.get_backend(service)
+                print(f'Initialisation du moteur {backend.label}')
+                if not backend.is_available():
+                    return {'status': 'error', 'message': f'{backend.label} non disponible sur cet appareil'}
+                voice = voice or backend.default_voice
                 
-                # Vérifier la voix
-                voices_result = self.get_voices('edge')
-                print(f'Résultat get_voices: {voices_result}')
-                
-                if voices_result['status'] == 'error':
-                    return voices_result
+                if service == 'edge':
+                    import edge_tts
+                    print(f'[Version edge-tts] {edge_tts.__version__}')
+                    
+                    # Vérifier la voix dans le catalogue local
+                    try:
+                        voice_exists = self.voice_catalog.has_voice(voice)
+                    except Exception as e:
+                        print(f'Catalogue des voix indisponible: {str(e)}')
+                        return {'status': 'error', 'message': str(e)}
                     
-                voice_exists = any(v["id"] == voice for v in voices_result['voices'])
-                if not voice_exists:
-                    print(f'La voix {voice} n\'existe pas')
-                    return {'status': 'error', 'message': f'La voix {voice} n\'existe pas'}
+                    if not voice_exists:
+                        print(f'La voix {voice} n\'existe pas')
+                        return {'status': 'error', 'message': f'La voix {voice} n\'existe pas'}
                 
                 # Synthèse vocale
                 try:
@@ -555,11 +634,8 @@ class ApiInterface:
                     presentation_text = "Bonjour, je suis votre narrateur, et voilà à quoi devrait ressembler un texte lu par moi."
                     print('Texte de présentation prêt')
                     
-                    # Créer un nouveau loop pour la synthèse
-                    loop = asyncio.new_event_loop()
-                    asyncio.set_event_loop(loop)
-                    success = loop.run_until_complete(self.do_tts(presentation_text, voice, temp_file))
-                    loop.close()
+                    # Synthèse dans la boucle partagée
+                    success = self.runtime.run(backend.synthesize(presentation_text, voice, temp_file))
                     
                     if not success:
                         return {'status': 'error', 'message': 'Échec de la synthèse vocale'}
@@ -628,34 +704,336 @@ class ApiInterface:
             print('FIN DU TEST DE VOIX')
             print('='*50)
 
-    def analyze_file(self, file_path):
-        """Analyse un fichier ePub ou PDF"""
+    def analyze_file(self, file_path, max_workers=None):
+        """Analyse un fichier ePub ou PDF
+
+        `max_workers` fixe le nombre de processus utilisés pour l'extraction des PDF.
+        """
         try:
             if not os.path.exists(file_path):
                 return {'status': 'error', 'message': 'Le fichier n\'existe pas'}
                 
-            if file_path.lower().endswith('.epub'):
-                chapters = self.epub_processor.analyze_epub(file_path)
-                # Convertir les objets Chapter en dictionnaires pour JSON
-                chapters_data = [
-                    {
-                        'title': chapter.title,
-                        'content': chapter.content,
-                        'content_src': chapter.content_src
-                    }
-                    for chapter in chapters
-                ]
-                return {'status': 'success', 'chapters': chapters_data}
-            elif file_path.lower().endswith('.pdf'):
-                chapters = self.pdf_processor.analyze_pdf(file_path)
-                return {'status': 'success', 'chapters': chapters}
-            else:
+            chapters = self.get_chapters(file_path, max_workers)
+            if chapters is None:
                 return {'status': 'error', 'message': 'Format de fichier non supporté'}
+            # Seul un résumé traverse le pont JS ; le texte est lu page par page
+            # avec get_chapter_content
+            summaries = [self.summarize_chapter(index, chapter) for index, chapter in enumerate(chapters)]
+            return {
+                'status': 'success',
+                'chapters': summaries,
+                'total_words': sum(summary['words'] for summary in summaries),
+                'total_duration': sum(summary['duration'] for summary in summaries)
+            }
         except Exception as e:
             print(f'Error analyzing file: {str(e)}')
             return {'status': 'error', 'message': str(e)}
 
-    def convert_to_audio(self, params):
+    def estimate_duration(self, words):
+        """Estime la durée de lecture (secondes) d'un texte au débit de voix courant"""
+        try:
+            speed = 1 + int(self.rate.rstrip('%')) / 100
+        except ValueError:
+            speed = 1
+        return round(words * 60 / (WORDS_PER_MINUTE * max(speed, 0.1)))
+
+    def summarize_chapter(self, index, chapter):
+        """Résumé d'un chapitre pour la liste de l'interface"""
+        words = len(chapter['content'].split())
+        return {
+            'index': index,
+            'title': chapter['title'],
+            'words': words,
+            'characters': len(chapter['content']),
+            'duration': self.estimate_duration(words)
+        }
+
+    def get_chapter_content(self, file_path, index, offset=0, length=CHAPTER_PAGE_SIZE):
+        """Renvoie une page du texte d'un chapitre, à partir du caractère `offset`.
+
+        La page s'arrête sur un espace si possible ; `next_offset` vaut None à la
+        fin du chapitre.
+        """
+        try:
+            chapters = self.get_chapters(file_path)
+            if chapters is None:
+                return {'status': 'error', 'message': 'Format de fichier non supporté'}
+            index = int(index)
+            if not 0 <= index < len(chapters):
+                return {'status': 'error', 'message': 'Chapitre introuvable'}
+
+            content = chapters[index]['content']
+            offset = max(0, int(offset))
+            end = min(len(content), offset + max(1, int(length)))
+            if end < len(content):
+                space = content.rfind(' ', offset, end)
+                if space > offset:
+                    end = space + 1
+            return {
+                'status': 'success',
+                'index': index,
+                'title': chapters[index]['title'],
+                'content': content[offset:end],
+                'offset': offset,
+                'next_offset': end if end < len(content) else None,
+                'length': len(content)
+            }
+        except Exception as e:
+            print(f'Error reading chapter content: {str(e)}')
+            return {'status': 'error', 'message': str(e)}
+
+    def resume_conversion(self, params):
+        """Reprend une conversion interrompue à partir de son manifeste"""
+        return self.convert_to_audio(params, resume=True)
+
+    def analyze_epub_chapters(self, file_path):
+        """Analyse un ePub et convertit les objets Chapter en dictionnaires pour JSON"""
+        return [
+            {
+                'title': chapter.title,
+                'content': chapter.content,
+                'content_src': chapter.content_src
+            }
+            for chapter in self._get_epub_processor().analyze_epub(file_path)
+        ]
+
+    @staticmethod
+    def analysis_kind(file_path):
+        """Type d'analyse du fichier ('epub', 'pdf' ou None si le format n'est pas supporté)"""
+        extension = os.path.splitext(file_path)[1].lower()
+        return {'.epub': 'epub', '.pdf': 'pdf'}.get(extension)
+
+    def get_cached_chapters(self, file_path):
+        """Chapitres déjà analysés du fichier, sans lancer d'analyse (None s'ils sont absents)"""
+        kind = self.analysis_kind(file_path)
+        return self.analysis_cache.get(self.analysis_cache.make_key(file_path, kind)) if kind else None
+
+    def iter_chapters(self, file_path):
+        """Produit les chapitres au fil de l'analyse, sans attendre la fin du livre.
+
+        Le résultat est mis en cache une fois l'analyse terminée s'il est identique
+        à celui de get_chapters (voir EpubProcessor.iter_epub_chapters). Les PDF ne
+        sont produits au fil des pages qu'en mode flux (Android) ; ailleurs,
+        l'extraction répartie sur plusieurs processus est plus rapide que la
+        détection page par page, et les chapitres arrivent à la fin de l'analyse.
+        En mode flux, rien n'est mis en cache : le texte du livre n'est jamais
+        gardé en entier en mémoire.
+        """
+        kind = self.analysis_kind(file_path)
+        key = self.analysis_cache.make_key(file_path, kind)
+        chapters = []
+        exact = True
+        if kind == 'epub':
+            report = {}
+            for chapter in self._get_epub_processor().iter_epub_chapters(file_path, report):
+                chapters.append({'title': chapter.title, 'content': chapter.content, 'content_src': chapter.content_src})
+                yield chapters[-1]
+            exact = report['exact']
+        else:
+            pdf_processor = self._get_pdf_processor()
+            if pdf_processor.streaming:
+                # Même détection que analyze_pdf, page par page, à mémoire bornée
+                yield from pdf_processor.iter_pdf_chapters(file_path)
+                return
+            for chapter in pdf_processor.analyze_pdf(file_path):
+                chapters.append(chapter)
+                yield chapter
+        if exact:
+            self.analysis_cache.put(key, chapters)
+
+    def get_chapters(self, file_path, max_workers=None):
+        """Renvoie les chapitres du fichier, analysé une seule fois tant qu'il ne change pas
+        (None si le format n'est pas supporté). La liste renvoyée ne doit pas être modifiée."""
+        if file_path.lower().endswith('.epub'):
+            return self.analysis_cache.get_or_analyze(file_path, 'epub', self.analyze_epub_chapters)
+        elif file_path.lower().endswith('.pdf'):
+            return self.analysis_cache.get_or_analyze(
+                file_path, 'pdf', lambda path: self._get_pdf_processor().analyze_pdf(path, max_workers)
+            )
+        return None
+
+    def load_chapters_data(self, file_path):
+        """Renvoie une copie des chapitres à convertir (None si le format n'est pas supporté)"""
+        chapters = self.get_chapters(file_path)
+        if chapters is None:
+            return None
+        return [self.new_chapter_data(chapter) for chapter in chapters]
+
+    @staticmethod
+    def new_chapter_data(chapter):
+        """Copie modifiable d'un chapitre analysé, avec son état de conversion"""
+        return {
+            'title': chapter['title'],
+            'content': chapter['content'],
+            'processed': False,
+            'attempts': 0
+        }
+
+    def get_book_info(self, file_path):
+        """Titre et auteur du livre, le nom du fichier servant de titre par défaut"""
+        if file_path.lower().endswith('.epub'):
+            info = self._get_epub_processor().extract_book_info(file_path)
+        else:
+            info = self._get_pdf_processor().extract_book_info(file_path)
+        info['title'] = info['title'] or Path(file_path).stem
+        return info
+
+    def assemble_book_file(self, file_path, output_dir, chapters_data):
+        """Assemble les chapitres convertis en un seul MP3 avec marqueurs ID3 (CHAP/CTOC)"""
+        info = self.get_book_info(file_path)
+        book_file = str(Path(output_dir) / f"{Path(file_path).stem}.mp3")
+        chapters = [
+            (chapter['title'], chapter['output_file'])
+            for chapter in chapters_data if os.path.exists(chapter['output_file'])
+        ]
+        assemble_book(chapters, book_file, info['title'], info['author'])
+        print(f"Livre assemblé : {book_file} ({len(chapters)} chapitres)")
+        return book_file
+
+    def chapter_output_file(self, output_dir, index, title):
+        """Chemin du MP3 du chapitre `index` (à partir de 0)"""
+        clean_title = "".join(x for x in title if x.isalnum() or x in (' ', '-', '_'))
+        return str(Path(output_dir) / f"{index+1:02d}_{clean_title}.mp3")
+
+    def get_output_dir(self, file_path, output_folder):
+        """Crée et renvoie le dossier de sortie du livre"""
+        output_dir = Path(output_folder) / Path(file_path).stem
+        output_dir.mkdir(parents=True, exist_ok=True)
+        return output_dir
+
+    def conversion_result(self, successful_chapters, total_chapters):
+        """Construit la réponse de fin de conversion"""
+        failed_chapters = total_chapters - successful_chapters
+        if failed_chapters == 0:
+            result = {'status': 'success', 'message': f'Conversion terminée. {successful_chapters} chapitres convertis.'}
+        else:
+            result = {
+                'status': 'partial_success',
+                'message': f'Conversion partielle. {successful_chapters} chapitres convertis, {failed_chapters} échecs.'
+            }
+        result.update({'converted': successful_chapters, 'total': total_chapters})
+        return result
+
+    async def convert_book(self, file_path, output_folder, voice, resume=False, limiter=None, on_progress=None,
+                           service='edge'):
+        """Convertit un livre avec le moteur `service` (voir tts_backends.py), sans
+        dépendre de la fenêtre.
+
+        `limiter` (AdaptiveLimiter) permet de partager la limite adaptative de
+        synthèses simultanées entre plusieurs livres, et `on_progress(state)` (voir
+        ConversionEngine.progress_state) remplace la mise à jour de l'interface
+        (voir cli.py).
+
+        Si le livre n'a pas encore été analysé, l'analyse et la synthèse se
+        recouvrent : chaque chapitre est converti dès qu'il est extrait.
+        """
+        if not self.analysis_kind(file_path):
+            return {'status': 'error', 'message': 'Format de fichier non supporté'}
+
+        # L'analyse tourne hors de la boucle pour ne pas bloquer les autres conversions
+        loop = asyncio.get_running_loop()
+        if resume:
+            # La reprise a besoin de la liste complète pour retrouver les segments déjà convertis
+            chapters_data = await loop.run_in_executor(None, self.load_chapters_data, file_path)
+        else:
+            cached = await loop.run_in_executor(None, self.get_cached_chapters, file_path)
+            chapters_data = [self.new_chapter_data(chapter) for chapter in cached] if cached is not None else None
+
+        output_dir = self.get_output_dir(file_path, output_folder)
+
+        backend = self.get_backend(service)
+        if not backend.is_available():
+            return {'status': 'error', 'message': f'{backend.label} non disponible sur cet appareil'}
+        voice = self.convert_voice_id(voice) if voice else backend.default_voice
+        # Vérification locale : le catalogue peut être vide si l'application n'a jamais été en ligne
+        if service == 'edge' and self.voice_catalog.voices and not self.voice_catalog.get_voice(voice):
+            return {'status': 'error', 'message': f'La voix {voice} n\'existe pas'}
+        # Segments limités à la taille de requête acceptée par le moteur
+        chunk_size = min(self.chunk_size, backend.max_request_chars)
+
+        # Manifeste de suivi pour pouvoir reprendre après un arrêt
+        manifest = JobManifest(output_dir)
+        settings = {
+            'service': backend.name,
+            'voice': voice,
+            'chunk_size': chunk_size,
+            'rate': self.rate,
+            'pitch': self.pitch
+        }
+
+        progress_bus = None
+        if on_progress is None:
+            # Progression regroupée, envoyée à l'interface depuis un thread dédié
+            progress_bus = ProgressBus(self.update_progress)
+            on_progress = progress_bus.publish
+
+        try:
+            if limiter is None:
+                # La concurrence démarre au niveau conseillé par le moteur, sans dépasser batch_size
+                limiter = AdaptiveLimiter(
+                    self.batch_size, initial_limit=min(self.batch_size, backend.recommended_concurrency)
+                )
+            engine = ConversionEngine(
+                backend.synthesize,
+                batch_size=self.batch_size,
+                retry_count=self.retry_count,
+                retry_delays=self.retry_delays,
+                on_progress=on_progress,
+                # Cache partagé par tous les livres exportés dans ce dossier
+                cache=SynthesisCache(Path(output_folder) / '.tts_cache'),
+                prosody={'rate': self.rate, 'pitch': self.pitch},
+                manifest=manifest,
+                limiter=limiter,
+                timeout=self.synthesis_timeout,
+                duration_model=self.duration_model,
+                service=backend.identity()
+            )
+            if chapters_data is None:
+                # Analyse en flux : la synthèse démarre dès le premier chapitre extrait
+                chapters_data = []
+                # Hash du livre entier : hors de la boucle partagée
+                await loop.run_in_executor(None, manifest.start, file_path, settings, chapters_data)
+
+                async def analyzed_chapters():
+                    async for chapter in iterate_in_thread(lambda: self.iter_chapters(file_path)):
+                        chapter = self.new_chapter_data(chapter)
+                        chapter['output_file'] = self.chapter_output_file(output_dir, len(chapters_data), chapter['title'])
+                        chapters_data.append(chapter)
+                        yield chapter
+
+                stream = analyzed_chapters()
+                try:
+                    successful_chapters = await engine.convert_stream(stream, voice, chunk_size)
+                finally:
+                    await stream.aclose()
+            else:
+                for index, chapter in enumerate(chapters_data):
+                    chapter['output_file'] = self.chapter_output_file(output_dir, index, chapter['title'])
+                    chapter['segments'] = engine.build_segments(chapter, chunk_size)
+
+                if resume:
+                    if not manifest.load():
+                        return {'status': 'error', 'message': 'Aucune conversion à reprendre'}
+                    if not await loop.run_in_executor(None, manifest.matches, file_path, settings):
+                        return {'status': 'error', 'message': 'Le fichier ou les paramètres ont changé depuis la conversion interrompue'}
+                    await loop.run_in_executor(None, manifest.restore, chapters_data)
+                    print(f"Reprise: {sum(1 for c in chapters_data if c['processed'])}/{len(chapters_data)} chapitres déjà convertis")
+                else:
+                    await loop.run_in_executor(None, manifest.start, file_path, settings, chapters_data)
+
+                successful_chapters = await engine.convert_chapters(chapters_data, voice, chunk_size)
+            result = self.conversion_result(successful_chapters, len(chapters_data))
+            if self.single_file and result['status'] == 'success':
+                # Assemblage en flux, hors de la boucle (lecture/écriture de tout le livre)
+                result['book_file'] = await loop.run_in_executor(
+                    None, self.assemble_book_file, file_path, output_dir, chapters_data
+                )
+            return result
+        finally:
+            if progress_bus:
+                await loop.run_in_executor(None, progress_bus.close)
+
+    def convert_to_audio(self, params, resume=False):
         """Convertit le fichier en audio"""
         try:
             file_path = params.get('file_path')
@@ -667,32 +1045,27 @@ class ApiInterface:
             if not all([file_path, output_folder, service]):
                 return {'status': 'error', 'message': 'Paramètres manquants'}
 
-            # Analyser le fichier pour obtenir les chapitres
-            if file_path.lower().endswith('.epub'):
-                chapters = self.epub_processor.analyze_epub(file_path)
-                chapters_data = [
-                    {
-                        'title': chapter.title,
-                        'content': chapter.content,
-                        'processed': False,
-                        'attempts': 0
-                    }
-                    for chapter in chapters
-                ]
-            else:
+            if not file_path.lower().endswith(('.epub', '.pdf')):
                 return {'status': 'error', 'message': 'Format de fichier non supporté'}
 
-            total_chapters = len(chapters_data)
-            book_name = Path(file_path).stem
-            output_dir = Path(output_folder) / book_name
-            output_dir.mkdir(parents=True, exist_ok=True)
+            if service in BACKENDS:
+                if service == 'edge' and self.is_android:
+                    return {'status': 'error', 'message': 'Edge TTS non disponible sur Android'}
+
+                # Exécuter la conversion dans la boucle partagée
+                result = self.runtime.run(self.convert_book(file_path, output_folder, voice, resume, service=service))
+
+                if result['status'] != 'error':
+                    total_chapters = result['total']
+                    self.update_progress(100 if result['status'] == 'success' else int((result['converted'] / total_chapters) * 100))
+                return result
 
-            if service == 'edge':
-                # Code existant pour Edge TTS
-                # ... (garder le code Edge TTS existant)
-                pass
-                
             elif service == 'google' and self.is_android:
+                chapters_data = self.load_chapters_data(file_path)
+                total_chapters = len(chapters_data)
+                total_chars = sum(len(chapter['content']) for chapter in chapters_data) or 1
+                output_dir = self.get_output_dir(file_path, output_folder)
+
                 from jnius import autoclass
                 TextToSpeech = autoclass('android.speech.tts.TextToSpeech')
                 File = autoclass('java.io.File')
@@ -700,9 +1073,10 @@ class ApiInterface:
                 
                 def process_android_tts():
                     processed_count = 0
+                    processed_chars = 0
                     
                     def onInit(status):
-                        nonlocal processed_count
+                        nonlocal processed_count, processed_chars
                         if status == TextToSpeech.SUCCESS:
                             # Configurer la voix si spécifiée
                             if voice:
@@ -735,8 +1109,9 @@ class ApiInterface:
                                             if result == TextToSpeech.SUCCESS:
                                                 chapter['processed'] = True
                                                 processed_count += 1
-                                                # Mettre à jour la progression
-                                                progress = int((processed_count / total_chapters) * 100)
+                                                processed_chars += len(chapter['content'])
+                                                # Progression pondérée par la taille des chapitres
+                                                progress = int((processed_chars / total_chars) * 100)
                                                 self.update_progress(progress)
                                         except Exception as e:
                                             print(f"Erreur lors de la conversion du chapitre {processed_count}: {str(e)}")
@@ -758,13 +1133,7 @@ class ApiInterface:
                 # Envoyer la progression finale
                 self.update_progress(100 if failed_chapters == 0 else int((successful_chapters / total_chapters) * 100))
                 
-                if failed_chapters == 0:
-                    return {'status': 'success', 'message': f'Conversion terminée. {successful_chapters} chapitres convertis.'}
-                else:
-                    return {
-                        'status': 'partial_success',
-                        'message': f'Conversion partielle. {successful_chapters} chapitres convertis, {failed_chapters} échecs.'
-                    }
+                return self.conversion_result(successful_chapters, total_chapters)
             else:
                 return {'status': 'error', 'message': 'Service non supporté'}
 
@@ -773,9 +1142,12 @@ class ApiInterface:
             return {'status': 'error', 'message': str(e)}
 
     def update_progress(self, progress):
-        """Met à jour la progression dans l'interface"""
+        """Met à jour la progression dans l'interface (pourcentage ou état détaillé)"""
         try:
-            js_code = f"window.dispatchEvent(new CustomEvent('conversionProgress', {{detail: {progress}}}));"
+            import webview
+            if not isinstance(progress, dict):
+                progress = {'percent': progress}
+            js_code = f"window.dispatchEvent(new CustomEvent('conversionProgress', {{detail: {json.dumps(progress)}}}));"
             webview.windows[0].evaluate_js(js_code)
         except Exception as e:
             print(f'Error updating progress: {str(e)}')
@@ -783,6 +1155,7 @@ class ApiInterface:
     def clean_temp_files(self):
         """Nettoie les fichiers temporaires"""
         try:
+            from epub_processor import clean_tmp
             if self.current_test_file and os.path.exists(self.current_test_file):
                 os.remove(self.current_test_file)
             clean_tmp()
@@ -830,6 +1203,14 @@ class ApiInterface:
                 self.batch_size = min(max(1, params['batchSize']), 20)
                 print(f'Nouvelle taille de lot: {self.batch_size}')
                 
+            if 'chunkSize' in params:
+                self.chunk_size = min(max(500, params['chunkSize']), 10000)
+                print(f'Nouvelle taille de segment: {self.chunk_size} caractères')
+                
+            if 'singleFile' in params:
+                self.single_file = bool(params['singleFile'])
+                print(f'Fichier unique du livre: {"oui" if self.single_file else "non"}')
+                
             if 'retryCount' in params:
                 self.retry_count = min(max(10, params['retryCount']), 50)
                 print(f'Nouveau nombre de tentatives: {self.retry_count}')
@@ -854,7 +1235,11 @@ def main():
         print('='*50)
         print('DÉMARRAGE DE L\'APPLICATION')
         
+        import webview
+        STARTUP_METRICS['webview_loaded'] = time.perf_counter() - STARTUP_TIME
+        
         api = ApiInterface()
+        STARTUP_METRICS['api_ready'] = time.perf_counter() - STARTUP_TIME
         print('API Interface créée')
         
         # Chemins des fichiers
@@ -898,9 +1283,18 @@ def main():
         
         print('Fenêtre créée')
         
+        def on_shown():
+            STARTUP_METRICS['window_shown'] = time.perf_counter() - STARTUP_TIME
+            print('Temps de démarrage : ' + ', '.join(
+                f'{step} {elapsed:.3f}s' for step, elapsed in STARTUP_METRICS.items()
+            ))
+        
+        window.events.shown += on_shown
+        
         print('Démarrage de webview...')
         webview.start(debug=True)
         print('Webview démarré')
+        api.runtime.stop()
         
     except Exception as e:
         print('ERREUR CRITIQUE')
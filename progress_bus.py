@@ -0,0 +1,65 @@
+import logging
+import threading
+import time
+
+# Intervalle minimal entre deux envois à l'interface (secondes)
+DEFAULT_INTERVAL = 0.5
+
+
+class ProgressBus:
+    """Canal de progression regroupé et asynchrone.
+
+    `publish(state)` ne fait que mémoriser le dernier état : il peut être appelé
+    depuis la boucle de conversion aussi souvent que nécessaire. Un thread dédié
+    transmet l'état le plus récent à `dispatch(state)` au plus une fois par
+    `interval`, si bien qu'un envoi lent (ex. `evaluate_js`) ne bloque jamais
+    la synthèse. `close()` envoie l'état final et arrête le thread.
+    """
+
+    def __init__(self, dispatch, interval=DEFAULT_INTERVAL):
+        self.dispatch = dispatch
+        self.interval = interval
+        self.condition = threading.Condition()
+        self.state = None
+        self.pending = False
+        self.closed = False
+        self.last_dispatch = 0
+        self.thread = threading.Thread(target=self._run, name='progress-bus', daemon=True)
+        self.thread.start()
+
+    def publish(self, state):
+        with self.condition:
+            self.state = state
+            self.pending = True
+            self.condition.notify()
+
+    def _run(self):
+        while True:
+            with self.condition:
+                while not self.pending and not self.closed:
+                    self.condition.wait()
+                if not self.pending:
+                    return
+                # Regrouper les mises à jour arrivées pendant l'intervalle
+                wait = self.last_dispatch + self.interval - time.monotonic()
+                if wait > 0 and not self.closed:
+                    self.condition.wait(wait)
+                    continue
+                state = self.state
+                self.pending = False
+                self.last_dispatch = time.monotonic()
+
+            try:
+                self.dispatch(state)
+            except Exception as e:
+                logging.warning(f"Erreur lors de l'envoi de la progression: {e}")
+
+    def close(self, timeout=5):
+        """Envoie le dernier état en attente puis arrête le thread."""
+        with self.condition:
+            self.closed = True
+            self.condition.notify()
+        self.thread.join(timeout)
+
+
+__all__ = ['ProgressBus', 'DEFAULT_INTERVAL']
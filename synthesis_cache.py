@@ -0,0 +1,107 @@
+import hashlib
+import logging
+import os
+import re
+import shutil
+import tempfile
+import threading
+import unicodedata
+
+# Taille maximale par défaut du cache (512 Mo)
+DEFAULT_CACHE_SIZE = 512 * 1024 * 1024
+
+
+class SynthesisCache:
+    """Cache disque des segments déjà synthétisés, adressé par leur contenu.
+
+    Une entrée est identifiée par le hash du moteur, du texte normalisé, de la
+    voix et des paramètres de prosodie. Les écritures sont atomiques (fichier temporaire puis
+    `os.replace`) et les entrées les moins récemment utilisées sont supprimées
+    lorsque la taille totale dépasse `max_bytes`.
+    """
+
+    def __init__(self, cache_dir, max_bytes=DEFAULT_CACHE_SIZE, extension='.mp3'):
+        self.cache_dir = str(cache_dir)
+        self.max_bytes = max_bytes
+        self.extension = extension
+        os.makedirs(self.cache_dir, exist_ok=True)
+        # get/put sont appelés depuis plusieurs threads (voir ConversionEngine)
+        self.lock = threading.Lock()
+        self.total_bytes = sum(size for _, size, _ in self._entries())
+
+    @staticmethod
+    def normalize_text(text):
+        text = unicodedata.normalize('NFC', text)
+        return re.sub(r'\s+', ' ', text).strip()
+
+    def make_key(self, text, voice, service='', **prosody):
+        """Calcule la clé d'un segment à partir du moteur (voir TTSBackend.identity),
+        du texte, de la voix et de la prosodie."""
+        digest = hashlib.sha256()
+        digest.update(service.encode('utf-8') + b'\0')
+        digest.update(self.normalize_text(text).encode('utf-8'))
+        digest.update(b'\0' + voice.encode('utf-8'))
+        for name in sorted(prosody):
+            digest.update(f'\0{name}={prosody[name]}'.encode('utf-8'))
+        return digest.hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, key + self.extension)
+
+    def _entries(self):
+        for entry in os.scandir(self.cache_dir):
+            if entry.is_file() and entry.name.endswith(self.extension):
+                stat = entry.stat()
+                yield entry.path, stat.st_size, stat.st_mtime
+
+    def get(self, key, output_file):
+        """Copie l'entrée `key` vers `output_file`. Renvoie False si absente."""
+        path = self._path(key)
+        try:
+            shutil.copyfile(path, output_file)
+            os.utime(path)  # Marque l'entrée comme récemment utilisée
+            return True
+        except FileNotFoundError:
+            return False
+        except OSError as e:
+            logging.error(f"Erreur de lecture du cache {path}: {e}")
+            return False
+
+    def put(self, key, source_file):
+        """Ajoute `source_file` au cache sous la clé `key` de manière atomique."""
+        path = self._path(key)
+        fd, temp_path = tempfile.mkstemp(dir=self.cache_dir, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as temp, open(source_file, 'rb') as source:
+                shutil.copyfileobj(source, temp)
+            with self.lock:
+                previous_size = os.path.getsize(path) if os.path.exists(path) else 0
+                os.replace(temp_path, path)
+                self.total_bytes += os.path.getsize(path) - previous_size
+        except OSError as e:
+            logging.error(f"Erreur d'écriture dans le cache {path}: {e}")
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            return False
+
+        with self.lock:
+            if self.total_bytes > self.max_bytes:
+                self.evict()
+        return True
+
+    def evict(self):
+        """Supprime les entrées les plus anciennes jusqu'à repasser sous `max_bytes`
+        (appelé sous `self.lock`)."""
+        entries = sorted(self._entries(), key=lambda entry: entry[2])
+        self.total_bytes = sum(size for _, size, _ in entries)
+        for path, size, _ in entries:
+            if self.total_bytes <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+                self.total_bytes -= size
+            except OSError as e:
+                logging.error(f"Impossible de supprimer l'entrée de cache {path}: {e}")
+
+
+__all__ = ['SynthesisCache', 'DEFAULT_CACHE_SIZE']
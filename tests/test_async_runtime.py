@@ -0,0 +1,67 @@
+import asyncio
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from async_runtime import iterate_in_thread
+from benchmarks.corpus import make_epub
+
+
+def test_iterate_in_thread_yields_in_order_and_reraises():
+    async def collect(make_iterator):
+        return [item async for item in iterate_in_thread(make_iterator, maxsize=2)]
+
+    assert asyncio.run(collect(lambda: iter(range(10)))) == list(range(10))
+
+    def failing():
+        yield 1
+        raise ValueError('analyse')
+
+    with pytest.raises(ValueError):
+        asyncio.run(collect(failing))
+
+
+def test_iterate_in_thread_does_not_use_default_executor():
+    async def consume():
+        loop = asyncio.get_running_loop()
+        loop.set_default_executor(ThreadPoolExecutor(max_workers=1))
+        stream = iterate_in_thread(lambda: iter(range(100)), maxsize=1)
+        first = await stream.__anext__()
+        # Le producteur est bloqué (file pleine) : le pool par défaut reste libre
+        assert await asyncio.wait_for(loop.run_in_executor(None, threading.get_ident), 5)
+        await stream.aclose()
+        return first
+
+    assert asyncio.run(consume()) == 0
+
+
+def test_more_books_than_executor_threads(tmp_path, monkeypatch):
+    monkeypatch.setenv('HOME', str(tmp_path / 'home'))
+    import main
+
+    books = []
+    for index in range(6):
+        path = str(tmp_path / f'livre{index}.epub')
+        make_epub(path, chapters=30, words_per_chapter=300, seed=index)
+        books.append(path)
+
+    api = main.ApiInterface()
+    # Un seul thread dans le pool par défaut : moins que de livres simultanés
+    api.runtime.start().set_default_executor(ThreadPoolExecutor(max_workers=1))
+
+    async def convert_all():
+        return await asyncio.gather(*(
+            api.convert_book(book, str(tmp_path / 'sortie'), None, service='silence', on_progress=lambda state: None)
+            for book in books
+        ))
+
+    try:
+        results = api.runtime.run(convert_all(), timeout=30)
+    finally:
+        api.runtime.stop()
+
+    assert [result['status'] for result in results] == ['success'] * len(books)
+    for index in range(len(books)):
+        assert len(os.listdir(tmp_path / 'sortie' / f'livre{index}')) >= 30
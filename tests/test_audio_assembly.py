@@ -0,0 +1,119 @@
+import io
+import struct
+
+from audio_assembly import MAX_TOC_ENTRIES, assemble_book, build_id3_tag, concatenate_mp3, iter_frames, mp3_duration
+
+# MPEG-2 couche III, 24 kHz, 48 kbit/s : 144 octets et 24 ms par trame
+HEADER = bytes([0xFF, 0xF3, 0x64, 0xC4])
+
+
+def frame(marker):
+    return HEADER + bytes([marker]) * 140
+
+
+def info_frame():
+    return HEADER + bytes(17) + b'Xing' + bytes(119)
+
+
+def id3v2_tag(payload=b'\x00' * 30):
+    size = len(payload)
+    return b'ID3\x03\x00\x00' + bytes([(size >> 21) & 0x7F, (size >> 14) & 0x7F, (size >> 7) & 0x7F, size & 0x7F]) + payload
+
+
+def write(path, data):
+    with open(path, 'wb') as f:
+        f.write(data)
+    return str(path)
+
+
+def test_iter_frames_skips_tags_info_frame_and_junk():
+    data = id3v2_tag() + info_frame() + frame(1) + b'\x00\x12junk' + frame(2) + b'TAG' + bytes(125) + frame(3)[:50]
+    frames = [item[0] for item in iter_frames(io.BytesIO(data), block_size=7)]
+    assert frames == [frame(1), frame(2)]
+
+
+def test_concatenate_keeps_frames_in_order(tmp_path):
+    first = write(tmp_path / 'a.mp3', id3v2_tag() + info_frame() + frame(1) * 3)
+    second = write(tmp_path / 'b.mp3', id3v2_tag() + frame(2) * 2 + b'TAG' + bytes(125))
+    output = io.BytesIO()
+
+    assert concatenate_mp3([first, second], output) == [72, 48]
+    assert output.getvalue() == frame(1) * 3 + frame(2) * 2
+    assert mp3_duration(write(tmp_path / 'c.mp3', output.getvalue())) == 120
+
+
+def parse_id3(tag):
+    """Renvoie l'en-tête et la liste `(identifiant, données)` des trames d'une étiquette ID3v2.3."""
+    assert tag[:5] == b'ID3\x03\x00'
+    size = 0
+    for byte in tag[6:10]:
+        size = (size << 7) | byte
+    assert size == len(tag) - 10
+    frames = []
+    position = 10
+    while position < len(tag):
+        frame_id = tag[position:position + 4].decode('ascii')
+        length = struct.unpack('>I', tag[position + 4:position + 8])[0]
+        frames.append((frame_id, tag[position + 10:position + 10 + length]))
+        position += 10 + length
+    return frames
+
+
+def text_of(data):
+    assert data[0] == 1
+    return data[1:].decode('utf-16')
+
+
+def parse_chapter(data):
+    element_id, rest = data.split(b'\x00', 1)
+    start, end = struct.unpack('>II', rest[:8])
+    (sub_id, sub_data), = parse_id3(id3v2_tag(rest[16:]))
+    assert sub_id == 'TIT2'
+    return element_id.decode(), text_of(sub_data), start, end
+
+
+def parse_toc(data):
+    element_id, rest = data.split(b'\x00', 1)
+    flags, count = rest[0], rest[1]
+    children = rest[2:].split(b'\x00')[:count]
+    return element_id.decode(), flags, [child.decode() for child in children]
+
+
+def test_id3_tag_has_chapters_and_toc():
+    markers = [('Prologue', 0, 1500), ('Chapitre 1 — Été', 1500, 4000)]
+    frames = parse_id3(build_id3_tag('Livre', 'Autrice', markers))
+
+    texts = {frame_id: text_of(data) for frame_id, data in frames if frame_id in ('TIT2', 'TALB', 'TPE1')}
+    assert texts == {'TIT2': 'Livre', 'TALB': 'Livre', 'TPE1': 'Autrice'}
+    chapters = [parse_chapter(data) for frame_id, data in frames if frame_id == 'CHAP']
+    assert chapters == [('ch0', 'Prologue', 0, 1500), ('ch1', 'Chapitre 1 — Été', 1500, 4000)]
+    tocs = [parse_toc(data) for frame_id, data in frames if frame_id == 'CTOC']
+    assert tocs == [('toc', 0x03, ['ch0', 'ch1'])]
+
+
+def test_large_toc_is_split():
+    count = MAX_TOC_ENTRIES + 10
+    markers = [(f'Chapitre {index}', index * 10, index * 10 + 10) for index in range(count)]
+    frames = parse_id3(build_id3_tag('Livre', chapters=markers))
+
+    assert 'TPE1' not in [frame_id for frame_id, _ in frames]
+    assert len([frame_id for frame_id, _ in frames if frame_id == 'CHAP']) == count
+    tocs = [parse_toc(data) for frame_id, data in frames if frame_id == 'CTOC']
+    assert tocs[0] == ('toc', 0x03, ['toc0', 'toc1'])
+    assert tocs[1] == ('toc0', 0x01, [f'ch{index}' for index in range(MAX_TOC_ENTRIES)])
+    assert tocs[2] == ('toc1', 0x01, [f'ch{index}' for index in range(MAX_TOC_ENTRIES, count)])
+
+
+def test_assemble_book_markers_are_contiguous(tmp_path):
+    chapters = [
+        ('Un', write(tmp_path / '1.mp3', frame(1) * 10)),
+        ('Deux', write(tmp_path / '2.mp3', id3v2_tag() + info_frame() + frame(2) * 5)),
+    ]
+    output = str(tmp_path / 'livre.mp3')
+
+    assert assemble_book(chapters, output, 'Livre') == [('Un', 0, 240), ('Deux', 240, 360)]
+    with open(output, 'rb') as f:
+        data = f.read()
+    assert data.endswith(frame(1) * 10 + frame(2) * 5)
+    assert mp3_duration(output) == 360
+    assert [name for name in (tmp_path).iterdir() if name.suffix == '.tmp'] == []
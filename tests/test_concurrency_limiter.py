@@ -0,0 +1,92 @@
+import asyncio
+
+from concurrency_limiter import AdaptiveLimiter
+
+
+def test_slow_start_then_additive_increase():
+    limiter = AdaptiveLimiter(10)
+    assert limiter.limit == 2
+    limiter.on_success(1.0, 100)
+    limiter.on_success(1.0, 100)
+    assert limiter.limit == 4
+
+    limiter.on_failure(started=1.0, now=2.0)
+    assert limiter.limit == 2
+    assert not limiter.slow_start
+
+    limiter.on_success(1.0, 100)
+    assert limiter.limit == 2.5
+
+
+def test_limit_stays_between_bounds():
+    limiter = AdaptiveLimiter(3, min_limit=2, initial_limit=3)
+    for _ in range(5):
+        limiter.on_success(1.0, 100)
+    assert limiter.limit == 3
+
+    for now in range(1, 6):
+        limiter.on_failure(started=now, now=now)
+    assert limiter.limit == 2
+
+
+def test_failures_of_same_wave_decrease_once():
+    limiter = AdaptiveLimiter(16, initial_limit=8)
+    # Trois requêtes parties avant la première baisse échouent ensemble
+    limiter.on_failure(started=1.0, now=5.0)
+    limiter.on_failure(started=2.0, now=5.1)
+    limiter.on_failure(started=3.0, now=5.2)
+    assert limiter.limit == 4
+    assert limiter.failures == 3
+
+    limiter.on_failure(started=6.0, now=7.0)
+    assert limiter.limit == 2
+
+
+def test_slower_requests_keep_the_limit():
+    limiter = AdaptiveLimiter(10, latency_tolerance=2.0)
+    limiter.on_success(1.0, 1000)
+    assert limiter.limit == 3
+    # Même latence pour un texte dix fois plus court : le service ralentit
+    limiter.on_success(1.0, 100)
+    assert limiter.limit == 3
+    assert not limiter.slow_start
+    limiter.on_success(0.1, 100)
+    assert limiter.limit == 3 + 1 / 3
+
+
+def test_acquire_grants_slots_by_priority():
+    async def run():
+        limiter = AdaptiveLimiter(1, initial_limit=1)
+        started = await limiter.acquire()
+        order = []
+
+        async def request(priority):
+            slot = await limiter.acquire(priority)
+            order.append(priority)
+            await limiter.release(slot, True)
+
+        tasks = [asyncio.ensure_future(request(priority)) for priority in (3, -5, 0, 2)]
+        await asyncio.sleep(0)
+        assert limiter.in_flight == 1
+        await limiter.release(started, True)
+        await asyncio.gather(*tasks)
+        return order, limiter.stats()
+
+    order, stats = asyncio.run(run())
+    assert order == [-5, 0, 2, 3]
+    assert stats['in_flight'] == 0 and stats['concurrency'] == 1
+
+
+def test_cancelled_waiter_does_not_leak_slot():
+    async def run():
+        limiter = AdaptiveLimiter(1, initial_limit=1)
+        started = await limiter.acquire()
+        waiting = asyncio.ensure_future(limiter.acquire())
+        await asyncio.sleep(0)
+        waiting.cancel()
+        await limiter.release(started, True)
+        await asyncio.gather(waiting, return_exceptions=True)
+        await asyncio.wait_for(limiter.acquire(), 1)
+        return limiter.in_flight
+
+    assert asyncio.run(run()) == 1
@@ -0,0 +1,168 @@
+import asyncio
+import hashlib
+import os
+
+from audio_assembly import mp3_duration
+from concurrency_limiter import AdaptiveLimiter
+from conversion_engine import ConversionEngine
+from synthesis_cache import SynthesisCache
+from tts_backends import SILENT_MP3_FRAME, SilenceBackend
+
+
+def make_chapters(directory, texts):
+    return [
+        {'title': f'Chapitre {index + 1}', 'content': text, 'output_file': os.path.join(str(directory), f'{index:02d}.mp3')}
+        for index, text in enumerate(texts)
+    ]
+
+
+def sentences(count, prefix='Phrase'):
+    return ' '.join(f'{prefix} numéro {index}.' for index in range(count))
+
+
+def text_frame(text):
+    """Trame MP3 dont la charge identifie le texte synthétisé."""
+    return SILENT_MP3_FRAME[:4] + hashlib.sha256(text.encode('utf-8')).digest() * 4 + bytes(12)
+
+
+def test_converts_chapters_with_silence_backend(tmp_path):
+    chapters = make_chapters(tmp_path, [sentences(200), sentences(20), sentences(5)])
+    states = []
+    engine = ConversionEngine(SilenceBackend().synthesize, on_progress=states.append)
+
+    assert asyncio.run(engine.convert_chapters(chapters, 'silence', max_chars=500)) == 3
+
+    for chapter in chapters:
+        assert chapter['processed']
+        assert mp3_duration(chapter['output_file']) > 0
+    assert not os.path.exists(tmp_path / '.segments')
+    assert states[-1]['percent'] == 100 and states[-1]['eta'] == 0
+
+
+def test_retries_failed_segments(tmp_path):
+    backend = SilenceBackend()
+    calls = {}
+
+    async def flaky(text, voice, output_file, **prosody):
+        calls[text] = calls.get(text, 0) + 1
+        if calls[text] < 3:
+            return False
+        return await backend.synthesize(text, voice, output_file, **prosody)
+
+    chapters = make_chapters(tmp_path, [sentences(50)])
+    engine = ConversionEngine(flaky, retry_count=5, retry_delays={})
+
+    assert asyncio.run(engine.convert_chapters(chapters, 'silence', max_chars=200)) == 1
+    assert all(segment['attempts'] == 3 for segment in chapters[0]['segments'])
+    assert set(calls.values()) == {3}
+
+
+def test_gives_up_after_retry_count(tmp_path):
+    attempts = []
+
+    async def failing(text, voice, output_file, **prosody):
+        attempts.append(text)
+        raise RuntimeError('service indisponible')
+
+    chapters = make_chapters(tmp_path, [sentences(10)])
+    engine = ConversionEngine(failing, retry_count=3, retry_delays={})
+
+    assert asyncio.run(engine.convert_chapters(chapters, 'silence')) == 0
+    assert not chapters[0].get('processed')
+    assert not os.path.exists(chapters[0]['output_file'])
+    assert len(attempts) == 3
+    assert chapters[0]['segments'][0]['attempts'] == 3
+
+
+def test_timeout_counts_as_failure(tmp_path):
+    chapters = make_chapters(tmp_path, [sentences(3)])
+    engine = ConversionEngine(SilenceBackend(latency=5).synthesize, retry_count=2, retry_delays={}, timeout=0.05)
+
+    assert asyncio.run(engine.convert_chapters(chapters, 'silence')) == 0
+    assert not os.path.exists(chapters[0]['output_file'])
+    assert chapters[0]['segments'][0]['attempts'] == 2
+
+
+def test_longest_segments_start_first(tmp_path):
+    order = []
+
+    async def record(text, voice, output_file, **prosody):
+        order.append(len(text))
+        with open(output_file, 'wb') as f:
+            f.write(text_frame(text))
+        return True
+
+    chapters = make_chapters(tmp_path, [sentences(3), sentences(60), sentences(12)])
+    engine = ConversionEngine(record, limiter=AdaptiveLimiter(1, initial_limit=1))
+
+    asyncio.run(engine.convert_chapters(chapters, 'silence', max_chars=400))
+    assert order == sorted(order, reverse=True)
+
+
+def test_convert_stream_stitches_segments_in_order(tmp_path):
+    texts = [sentences(40, 'Début'), sentences(8, 'Milieu'), sentences(25, 'Fin')]
+    chapters = make_chapters(tmp_path, texts)
+    received = []
+
+    async def reversed_latency(text, voice, output_file, **prosody):
+        # Les premiers segments d'un chapitre finissent les derniers
+        await asyncio.sleep(0.001 * (len(text) % 7))
+        with open(output_file, 'wb') as f:
+            f.write(text_frame(text))
+        return True
+
+    async def arriving():
+        for chapter in chapters:
+            await asyncio.sleep(0.01)
+            received.append(chapter['title'])
+            yield chapter
+
+    engine = ConversionEngine(reversed_latency, batch_size=4)
+    assert asyncio.run(engine.convert_stream(arriving(), 'silence', max_chars=120, max_pending=3)) == 3
+
+    assert received == [chapter['title'] for chapter in chapters]
+    for chapter, text in zip(chapters, texts):
+        segments = engine.build_segments({'content': text, 'title': '', 'output_file': chapter['output_file']}, 120)
+        with open(chapter['output_file'], 'rb') as f:
+            assert f.read() == b''.join(text_frame(segment['content']) for segment in segments)
+        # Texte libéré une fois le chapitre assemblé
+        assert chapter['content'] == ''
+
+
+def test_convert_stream_cancels_on_analysis_error(tmp_path):
+    chapters = make_chapters(tmp_path, [sentences(30)])
+
+    async def failing_analysis():
+        yield chapters[0]
+        raise ValueError('ePub corrompu')
+
+    engine = ConversionEngine(SilenceBackend(latency=0.05).synthesize)
+
+    async def run():
+        try:
+            await engine.convert_stream(failing_analysis(), 'silence', max_chars=100)
+        except ValueError:
+            return [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+
+    assert asyncio.run(run()) == []
+
+
+def test_cache_is_keyed_by_backend(tmp_path):
+    cache = SynthesisCache(tmp_path / '.tts_cache')
+    calls = []
+    backend = SilenceBackend()
+
+    async def counting(text, voice, output_file, **prosody):
+        calls.append(text)
+        return await backend.synthesize(text, voice, output_file, **prosody)
+
+    def convert(service):
+        chapters = make_chapters(tmp_path, [sentences(10)])
+        engine = ConversionEngine(counting, cache=cache, service=service)
+        return asyncio.run(engine.convert_chapters(chapters, 'fr-FR-DeniseNeural'))
+
+    convert('silence')
+    convert('silence')
+    assert len(calls) == 1
+    convert('edge')
+    assert len(calls) == 2
@@ -0,0 +1,53 @@
+import random
+
+from benchmarks.corpus import make_epub
+from epub_processor import NEAR_DUPLICATE_THRESHOLD, EpubProcessor, fingerprint_similarity, fingerprint_text
+
+
+def random_words(seed, count=400):
+    rng = random.Random(seed)
+    return [rng.choice(['mer', 'nuit', 'ville', 'porte', 'soleil', 'route', 'chat', 'forêt', 'lune', 'pluie'])
+            + str(rng.randint(0, 50)) for _ in range(count)]
+
+
+def test_similarity_of_identical_near_and_different_texts():
+    words = random_words(1)
+    text = ' '.join(words)
+    near = list(words)
+    near[200] = 'modifié'
+    fingerprint = fingerprint_text(text)
+
+    assert fingerprint_text('  ' + text + '\n')['hash'] == fingerprint['hash']
+    assert fingerprint_similarity(fingerprint, fingerprint_text(text)) == 1.0
+    assert fingerprint_similarity(fingerprint, fingerprint_text(' '.join(near))) >= NEAR_DUPLICATE_THRESHOLD
+    assert fingerprint_similarity(fingerprint, fingerprint_text(' '.join(random_words(2)))) < 0.2
+    # Un texte beaucoup plus court ne peut pas être un quasi-doublon
+    assert fingerprint_similarity(fingerprint, fingerprint_text(' '.join(words[:100]))) < NEAR_DUPLICATE_THRESHOLD
+    assert fingerprint_similarity(fingerprint_text(''), fingerprint_text('')) == 0.0
+
+
+def test_clean_chapters_keeps_valid_title_among_duplicates():
+    processor = EpubProcessor()
+    text = ' '.join(random_words(3))
+    near = text.replace(text.split()[150], 'variante', 1)
+    chapters = [
+        EpubProcessor.Chapter('Chapitre 2', 'b.xhtml', ' '.join(random_words(4))),
+        EpubProcessor.Chapter('Couverture', 'a.xhtml', text),
+        EpubProcessor.Chapter('Chapitre 1', 'c.xhtml', near),
+        EpubProcessor.Chapter('Chapitre 1 (copie)', 'd.xhtml', text),
+    ]
+
+    cleaned = processor.clean_chapters(chapters)
+    assert [chapter.title for chapter in cleaned] == ['Chapitre 1', 'Chapitre 2']
+
+
+def test_streamed_chapters_match_analyze_epub(tmp_path):
+    path = str(tmp_path / 'livre.epub')
+    make_epub(path, chapters=12, words_per_chapter=200, seed=7)
+
+    expected = [(chapter.title, chapter.content) for chapter in EpubProcessor().analyze_epub(path)]
+    report = {}
+    streamed = [(chapter.title, chapter.content) for chapter in EpubProcessor().iter_epub_chapters(path, report)]
+
+    assert streamed == expected
+    assert report['exact']
@@ -0,0 +1,25 @@
+import pytest
+
+from epub_processor import extract_sections, extract_text
+
+pytest.importorskip('lxml')
+
+DOCUMENTS = [
+    '<html><body><h1>Chapitre 1</h1><p>Un <b>texte</b>\nsur deux lignes.</p></body></html>',
+    '<html><body><p>Avant</p><![CDATA[Texte brut]]><p>Après <b>x</b></p></body></html>',
+    '<?xml version="1.0" encoding="utf-8"?>'
+    '<html xmlns="http://www.w3.org/1999/xhtml"><body>'
+    '<p>a<![CDATA[b < c]]>d</p><h2 id="s2">Section</h2><p>Suite</p></body></html>',
+]
+
+
+@pytest.mark.parametrize('content', DOCUMENTS)
+def test_lxml_text_matches_html_parser(content):
+    assert extract_text(content, parser='lxml') == extract_text(content, parser='html.parser')
+
+
+@pytest.mark.parametrize('content', DOCUMENTS)
+def test_lxml_sections_match_html_parser(content):
+    fragments = ['s2'] if 'id="s2"' in content else []
+    assert (extract_sections(content, fragments, parser='lxml')
+            == extract_sections(content, fragments, parser='html.parser'))
@@ -0,0 +1,111 @@
+import os
+
+from conversion_engine import ConversionEngine
+from job_manifest import MANIFEST_NAME, JobManifest, file_checksum
+
+SETTINGS = {'voice': 'silence', 'max_chars': 40}
+
+
+def write(path, data):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'wb') as f:
+        f.write(data)
+
+
+def make_chapters(directory, texts):
+    engine = ConversionEngine(None)
+    chapters = []
+    for index, text in enumerate(texts):
+        chapter = {'title': f'Chapitre {index + 1}', 'content': text, 'output_file': os.path.join(str(directory), f'{index:02d}.mp3')}
+        chapter['segments'] = engine.build_segments(chapter, SETTINGS['max_chars'])
+        chapters.append(chapter)
+    return chapters
+
+
+def start_job(tmp_path, texts):
+    book = str(tmp_path / 'livre.epub')
+    if not os.path.exists(book):
+        write(book, b'contenu du livre')
+    chapters = make_chapters(tmp_path, texts)
+    manifest = JobManifest(tmp_path)
+    manifest.start(book, SETTINGS, chapters)
+    return book, chapters, manifest
+
+
+def complete_segment(manifest, segment):
+    write(segment['output_file'], segment['content'].encode('utf-8'))
+    segment['processed'] = True
+    manifest.record_segment(segment)
+
+
+def reload(tmp_path, book, texts):
+    manifest = JobManifest(tmp_path)
+    assert manifest.load() and manifest.matches(book, SETTINGS)
+    chapters = make_chapters(tmp_path, texts)
+    manifest.restore(chapters)
+    return chapters
+
+
+TEXTS = ['Première phrase du chapitre. Deuxième phrase du chapitre.', 'Autre chapitre.']
+
+
+def test_restores_completed_segments_and_chapters(tmp_path):
+    book, chapters, manifest = start_job(tmp_path, TEXTS)
+    complete_segment(manifest, chapters[0]['segments'][0])
+    write(chapters[1]['output_file'], b'audio')
+    chapters[1]['processed'] = True
+    manifest.record_chapter(chapters[1])
+    manifest.save()
+
+    restored = reload(tmp_path, book, TEXTS)
+    assert [segment['processed'] for segment in restored[0]['segments']] == [True, False]
+    assert restored[1]['processed']
+    assert restored[1]['checksum'] == file_checksum(chapters[1]['output_file'])
+
+
+def test_checksum_mismatch_invalidates_segment(tmp_path):
+    book, chapters, manifest = start_job(tmp_path, TEXTS)
+    for segment in chapters[0]['segments']:
+        complete_segment(manifest, segment)
+    manifest.save()
+    write(chapters[0]['segments'][1]['output_file'], b'fichier tronque')
+
+    restored = reload(tmp_path, book, TEXTS)
+    assert [segment['processed'] for segment in restored[0]['segments']] == [True, False]
+
+
+def test_changed_text_invalidates_segment(tmp_path):
+    book, chapters, manifest = start_job(tmp_path, TEXTS)
+    for segment in chapters[0]['segments']:
+        complete_segment(manifest, segment)
+    manifest.save()
+
+    texts = ['Première phrase du chapitre. Deuxième phrase corrigée.', TEXTS[1]]
+    restored = reload(tmp_path, book, texts)
+    assert [segment['processed'] for segment in restored[0]['segments']] == [True, False]
+
+
+def test_other_book_or_settings_do_not_match(tmp_path):
+    book, _, _ = start_job(tmp_path, TEXTS)
+    manifest = JobManifest(tmp_path)
+    assert manifest.load()
+    assert not manifest.matches(book, dict(SETTINGS, voice='autre'))
+    write(book, b'autre livre')
+    assert not manifest.matches(book, SETTINGS)
+
+
+def test_record_chapter_saves_immediately(tmp_path):
+    book, chapters, manifest = start_job(tmp_path, TEXTS)
+    manifest.save_interval = 3600
+    complete_segment(manifest, chapters[1]['segments'][0])
+    assert not reload(tmp_path, book, TEXTS)[1]['segments'][0]['processed']
+
+    write(chapters[1]['output_file'], b'audio')
+    chapters[1]['processed'] = True
+    manifest.record_chapter(chapters[1], checksum=file_checksum(chapters[1]['output_file']))
+    assert reload(tmp_path, book, TEXTS)[1]['processed']
+
+
+def test_unreadable_manifest_is_ignored(tmp_path):
+    write(str(tmp_path / MANIFEST_NAME), b'{pas du json')
+    assert not JobManifest(tmp_path).load()
@@ -0,0 +1,58 @@
+import os
+
+from synthesis_cache import SynthesisCache
+
+
+def write(path, size, fill=b'a'):
+    with open(path, 'wb') as f:
+        f.write(fill * size)
+    return str(path)
+
+
+def test_put_and_get_roundtrip(tmp_path):
+    cache = SynthesisCache(tmp_path / 'cache')
+    key = cache.make_key('Bonjour', 'voix')
+    output = str(tmp_path / 'sortie.mp3')
+
+    assert not cache.get(key, output)
+    assert cache.put(key, write(tmp_path / 'source.mp3', 100, b'x'))
+    assert cache.get(key, output)
+    with open(output, 'rb') as f:
+        assert f.read() == b'x' * 100
+    assert cache.total_bytes == 100
+
+
+def test_key_normalizes_text_and_includes_settings(tmp_path):
+    cache = SynthesisCache(tmp_path)
+    key = cache.make_key('Bonjour  le\nmonde ', 'voix', rate='+0%')
+    assert key == cache.make_key('Bonjour le monde', 'voix', rate='+0%')
+    assert key == cache.make_key('Bonjour le monde', 'voix', '', rate='+0%')
+    assert key != cache.make_key('Bonjour le monde', 'autre', rate='+0%')
+    assert key != cache.make_key('Bonjour le monde', 'voix', rate='+10%')
+    assert key != cache.make_key('Bonjour le monde', 'voix', 'espeak:espeak-ng', rate='+0%')
+
+
+def test_replacing_entry_updates_size(tmp_path):
+    cache = SynthesisCache(tmp_path / 'cache')
+    cache.put('cle', write(tmp_path / 'a.mp3', 100))
+    cache.put('cle', write(tmp_path / 'b.mp3', 40))
+    assert cache.total_bytes == 40
+    assert SynthesisCache(tmp_path / 'cache').total_bytes == 40
+
+
+def test_evicts_least_recently_used(tmp_path):
+    cache = SynthesisCache(tmp_path / 'cache', max_bytes=300)
+    for index, key in enumerate(['a', 'b', 'c']):
+        cache.put(key, write(tmp_path / f'{key}.mp3', 100))
+        os.utime(cache._path(key), (1000 + index, 1000 + index))
+
+    # Une lecture rend « a » récente : « b » devient la plus ancienne
+    assert cache.get('a', str(tmp_path / 'lu.mp3'))
+    cache.put('d', write(tmp_path / 'd.mp3', 100))
+
+    assert sorted(os.listdir(tmp_path / 'cache')) == ['a.mp3', 'c.mp3', 'd.mp3']
+    assert cache.total_bytes == 300
+
+    cache.put('e', write(tmp_path / 'e.mp3', 250))
+    assert cache.total_bytes <= 300
+    assert os.path.exists(cache._path('e'))
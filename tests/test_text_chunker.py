@@ -0,0 +1,48 @@
+import random
+
+from text_chunker import split_text
+
+WORDS = ['le', 'livre', 'chapitre', 'anticonstitutionnellement', 'voix', 'Paris', 'nuit', 'lumière']
+
+
+def random_text(seed, paragraphs=20):
+    rng = random.Random(seed)
+    result = []
+    for _ in range(paragraphs):
+        sentences = []
+        for _ in range(rng.randint(1, 8)):
+            words = [rng.choice(WORDS) for _ in range(rng.randint(1, 40))]
+            sentences.append(' '.join(words).capitalize() + rng.choice(['.', ' !', ' ?', '…', '.»']))
+        result.append(' '.join(sentences))
+    return '\n\n'.join(result)
+
+
+def test_chunks_respect_max_chars_and_keep_words():
+    for seed in range(30):
+        text = random_text(seed)
+        for max_chars in (40, 200, 3000):
+            chunks = split_text(text, max_chars)
+            assert [chunk['index'] for chunk in chunks] == list(range(len(chunks)))
+            assert all(0 < len(chunk['text']) <= max_chars for chunk in chunks)
+            assert ' '.join(chunk['text'] for chunk in chunks).split() == text.split()
+
+
+def test_sentences_are_not_cut_when_they_fit():
+    text = 'Première phrase courte. Deuxième phrase un peu plus longue ! Troisième ?'
+    chunks = [chunk['text'] for chunk in split_text(text, 40)]
+    assert chunks == ['Première phrase courte.', 'Deuxième phrase un peu plus longue !', 'Troisième ?']
+
+
+def test_paragraphs_are_grouped():
+    chunks = split_text('Un.\n\nDeux.\n\nTrois.', 3000)
+    assert [chunk['text'] for chunk in chunks] == ['Un.\nDeux.\nTrois.']
+
+
+def test_words_longer_than_max_chars_are_split():
+    chunks = split_text('a' * 25 + ' fin.', 10)
+    assert [chunk['text'] for chunk in chunks] == ['a' * 10, 'a' * 10, 'a' * 5 + ' fin.']
+
+
+def test_empty_text():
+    assert split_text('', 100) == []
+    assert split_text(' \n\n \n', 100) == []
@@ -0,0 +1,46 @@
+import random
+import re
+
+from text_normalizer import format_lines, normalize_whitespace, split_sections
+
+
+def old_clean_and_format_text(text):
+    """Version d'origine de `clean_and_format_text`, référence de format_lines."""
+    text = re.sub(r'\n{2,}', '\n\n', text)
+    lines = text.split('\n')
+    formatted_lines = []
+    for i, line in enumerate(lines):
+        line = line.strip()
+        if not line:
+            continue
+        if i < len(lines) - 1:
+            next_line = lines[i + 1].strip()
+            if not line.endswith(('.', '!', '?', ':', '"', "'")) and (not next_line or not next_line[0].isupper()):
+                formatted_lines.append(line + ' ')
+            else:
+                formatted_lines.append(line + '\n')
+        else:
+            formatted_lines.append(line)
+    formatted_text = ''.join(formatted_lines)
+    formatted_text = re.sub(r' {2,}', ' ', formatted_text)
+    return formatted_text.strip()
+
+
+PIECES = ['mot', 'Mot', 'fin.', 'Question ?', 'dit :', '"cite"', "l'", 'É', 'été', '', ' ', '   ', '\t', '  deux  espaces  ', '\n', '\n\n']
+
+
+def test_format_lines_matches_old_implementation():
+    rng = random.Random(0)
+    for _ in range(2000):
+        lines = [''.join(rng.choice(PIECES) for _ in range(rng.randint(0, 4))) for _ in range(rng.randint(0, 8))]
+        assert format_lines(lines) == old_clean_and_format_text('\n'.join(lines)), lines
+
+
+def test_normalize_whitespace():
+    for text in ['', '  a  b\n\tc ', 'un deux', 'x']:
+        assert normalize_whitespace(text) == re.sub(r'\s+', ' ', text).strip()
+
+
+def test_split_sections():
+    strings = ['Avant ', ' le  titre', '\0s1\0', 'Section ', 'un', '\0s2\0', '\n']
+    assert split_sections(strings, '\0') == [(None, 'Avant le titre'), ('s1', 'Section un'), ('s2', '')]
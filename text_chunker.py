@@ -0,0 +1,79 @@
+import re
+
+# Taille par défaut d'un segment (en caractères) envoyé au service TTS
+DEFAULT_CHUNK_SIZE = 3000
+
+PARAGRAPH_BREAK = re.compile(r'\n\s*\n|\n')
+SENTENCE_END = re.compile(r'[.!?…]+(?:\s*["»”’)\]])*\s+')
+
+
+def split_sentences(paragraph):
+    """Découpe un paragraphe en phrases en conservant la ponctuation finale."""
+    sentences = []
+    start = 0
+    for match in SENTENCE_END.finditer(paragraph):
+        sentences.append(paragraph[start:match.end()].strip())
+        start = match.end()
+    if start < len(paragraph):
+        sentences.append(paragraph[start:].strip())
+    return [sentence for sentence in sentences if sentence]
+
+
+def split_long_piece(piece, max_chars):
+    """Découpe une phrase trop longue aux espaces, puis en dur si nécessaire."""
+    parts = []
+    current = ''
+    for word in piece.split():
+        while len(word) > max_chars:
+            if current:
+                parts.append(current)
+                current = ''
+            parts.append(word[:max_chars])
+            word = word[max_chars:]
+        if current and len(current) + 1 + len(word) > max_chars:
+            parts.append(current)
+            current = word
+        else:
+            current = f'{current} {word}' if current else word
+    if current:
+        parts.append(current)
+    return parts
+
+
+def split_text(text, max_chars=DEFAULT_CHUNK_SIZE):
+    """Découpe le texte d'un chapitre en segments d'au plus `max_chars` caractères.
+
+    Les coupures se font en priorité aux fins de paragraphe, puis aux fins de phrase.
+    Chaque segment reçoit un index stable (sa position dans le chapitre) qui permet
+    de le synthétiser indépendamment puis de réassembler l'audio dans l'ordre.
+    """
+    max_chars = max(1, int(max_chars))
+    chunks = []
+    current = ''
+    separator = ' '
+
+    def flush():
+        nonlocal current
+        if current:
+            chunks.append({'index': len(chunks), 'text': current})
+            current = ''
+
+    for paragraph in PARAGRAPH_BREAK.split(text or ''):
+        paragraph = paragraph.strip()
+        if not paragraph:
+            continue
+        for sentence in split_sentences(paragraph):
+            pieces = [sentence] if len(sentence) <= max_chars else split_long_piece(sentence, max_chars)
+            for piece in pieces:
+                if current and len(current) + len(separator) + len(piece) > max_chars:
+                    flush()
+                current = f'{current}{separator}{piece}' if current else piece
+                separator = ' '
+        # Un saut de paragraphe est conservé à l'intérieur d'un segment
+        separator = '\n'
+
+    flush()
+    return chunks
+
+
+__all__ = ['DEFAULT_CHUNK_SIZE', 'split_text']
@@ -0,0 +1,78 @@
+"""Normalisation du texte extrait des ePub et des PDF, en une seule passe.
+
+Les fonctions travaillent sur des flux de fragments (chaînes d'un document
+HTML, lignes d'une page PDF) au lieu de réécrire plusieurs fois le texte
+complet d'un chapitre avec des expressions régulières.
+"""
+import re
+
+# Fins de ligne qui terminent une phrase dans un PDF (pas de fusion avec la suivante)
+LINE_ENDINGS = ('.', '!', '?', ':', '"', "'")
+MULTIPLE_SPACES = re.compile(r' {2,}')
+
+
+def normalize_whitespace(text):
+    """Équivalent de `re.sub(r'\\s+', ' ', text).strip()`."""
+    return ' '.join(text.split())
+
+
+def split_sections(strings, marker):
+    """Découpe un flux de chaînes aux marqueurs `<marker>ancre<marker>`.
+
+    Chaque marqueur doit être une chaîne à part entière du flux. Renvoie la liste
+    `(ancre, texte)` dont le texte a ses blancs normalisés ; la première section
+    (ancre None) contient le texte précédant le premier marqueur.
+    """
+    sections = []
+    fragment = None
+    words = []
+    for string in strings:
+        if len(string) > 1 and string[0] == marker and string[-1] == marker:
+            sections.append((fragment, ' '.join(words)))
+            fragment = string[1:-1]
+            words = []
+        else:
+            words.extend(string.split())
+    sections.append((fragment, ' '.join(words)))
+    return sections
+
+
+def iter_physical_lines(lines):
+    for line in lines:
+        if '\n' in line:
+            yield from line.split('\n')
+        else:
+            yield line
+
+
+def format_lines(lines):
+    """Met en forme les lignes d'un chapitre PDF en une passe.
+
+    Une ligne est jointe à la suivante par une espace si elle ne termine pas une
+    phrase et que la suivante (vide ou non) ne commence pas par une majuscule,
+    sinon par un saut de ligne ; les lignes vides sont supprimées et les espaces
+    multiples réduits. Donne le même résultat que `'\\n'.join(lines)` passé à
+    l'ancien `clean_and_format_text`.
+    """
+    parts = []
+    previous = None  # Dernière ligne non vide, en attente de son séparateur
+    for line in iter_physical_lines(lines):
+        line = line.strip()
+        if previous is not None:
+            parts.append(previous)
+            if not previous.endswith(LINE_ENDINGS) and (not line or not line[0].isupper()):
+                parts.append(' ')
+            else:
+                parts.append('\n')
+            previous = None
+        if line:
+            previous = MULTIPLE_SPACES.sub(' ', line) if '  ' in line else line
+
+    if previous is not None:
+        parts.append(previous)
+    elif parts:
+        parts.pop()  # Séparateur final
+    return ''.join(parts)
+
+
+__all__ = ['normalize_whitespace', 'split_sections', 'format_lines']
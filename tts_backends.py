@@ -0,0 +1,299 @@
+import asyncio
+import importlib.util
+import logging
+import os
+import shutil
+
+from audio_writer import PartFileWriter
+
+# Trame MP3 silencieuse de 144 octets : MPEG-2 couche III, 24 kHz, 48 kbit/s, mono (24 ms)
+SILENT_MP3_FRAME = bytes([0xFF, 0xF3, 0x64, 0xC4]) + bytes(140)
+SILENT_FRAME_DURATION = 0.024
+# Débit de lecture simulé par le moteur silencieux (caractères par seconde à +0%)
+SILENCE_CHARS_PER_SECOND = 15
+# Taille des blocs lus sur la sortie des moteurs locaux
+STREAM_BLOCK_SIZE = 64 * 1024
+# Débit (mots par minute) et hauteur par défaut d'eSpeak
+ESPEAK_DEFAULT_SPEED = 175
+ESPEAK_DEFAULT_PITCH = 50
+
+
+def parse_prosody(value, unit):
+    """Convertit une valeur de prosodie Edge ('+10%', '-2Hz') en nombre (0 si invalide)."""
+    try:
+        return float(str(value).strip().rstrip(unit) or 0)
+    except ValueError:
+        return 0.0
+
+
+class TTSBackend:
+    """Interface commune des moteurs de synthèse vocale.
+
+    Un moteur décrit ce qu'il sait faire (`capabilities`), la taille maximale
+    d'une requête (`max_request_chars`) et la concurrence conseillée
+    (`recommended_concurrency`). Il liste ses voix et produit l'audio MP3 d'un
+    texte sous forme de blocs d'octets (`stream`). `synthesize` écrit ce flux
+    dans un fichier au fil de sa réception et a la signature attendue par
+    ConversionEngine.
+    """
+
+    name = None
+    label = None
+    default_voice = None
+    max_request_chars = 10000
+    recommended_concurrency = 4
+    capabilities = {
+        'network': False,  # Nécessite une connexion
+        'prosody': False,  # Débit et hauteur réglables
+        'format': 'mp3',
+    }
+    # ByteBudget global optionnel : plafond des octets reçus en attente d'écriture
+    byte_budget = None
+
+    def is_available(self):
+        return True
+
+    async def list_voices(self, locale_prefix=None):
+        """Renvoie les voix disponibles (dictionnaires id, name, locale, gender)."""
+        raise NotImplementedError
+
+    async def stream(self, text, voice, rate='+0%', pitch='+0Hz'):
+        """Génère les blocs MP3 de la synthèse de `text`."""
+        raise NotImplementedError
+        yield
+
+    async def synthesize(self, text, voice, output_file, rate='+0%', pitch='+0Hz'):
+        """Écrit la synthèse de `text` dans `output_file` (via un fichier `.part`
+        renommé à la fin, voir PartFileWriter) ; renvoie la somme de contrôle sha256
+        du fichier, ou False en cas d'échec."""
+        writer = PartFileWriter(output_file, self.byte_budget)
+        try:
+            if self.byte_budget:
+                # Écritures en retard : la requête attend avant de solliciter le moteur
+                await self.byte_budget.acquire(0)
+            async for block in self.stream(text, voice, rate=rate, pitch=pitch):
+                await writer.write(block)
+            return await writer.commit()
+        except Exception as e:
+            logging.error(f"Erreur lors de la synthèse vocale ({self.name}): {e}")
+            return False
+        finally:
+            await writer.abort()
+
+    def identity(self):
+        """Identifie le moteur et ses réglages propres : les caches et les mesures
+        de durée ne sont jamais partagés entre deux moteurs différents."""
+        return self.name
+
+    def describe(self):
+        """Description sérialisable du moteur (pour l'interface et les journaux)."""
+        return {
+            'name': self.name,
+            'label': self.label,
+            'available': self.is_available(),
+            'default_voice': self.default_voice,
+            'max_request_chars': self.max_request_chars,
+            'recommended_concurrency': self.recommended_concurrency,
+            'capabilities': dict(self.capabilities)
+        }
+
+
+class EdgeBackend(TTSBackend):
+    """Service en ligne Microsoft Edge (edge-tts), importé à la première utilisation."""
+
+    name = 'edge'
+    label = 'Microsoft Edge'
+    default_voice = 'fr-FR-DeniseNeural'
+    recommended_concurrency = 4
+    capabilities = {'network': True, 'prosody': True, 'format': 'mp3'}
+
+    def __init__(self, get_connector=None):
+        # get_connector() -> connecteur aiohttp partagé (voir AsyncRuntime.get_connector)
+        self.get_connector = get_connector
+
+    def is_available(self):
+        return importlib.util.find_spec('edge_tts') is not None
+
+    def connector(self):
+        return self.get_connector() if self.get_connector else None
+
+    async def fetch_voices(self):
+        """Catalogue brut du service, au format d'edge_tts.list_voices (voir VoiceCatalog)."""
+        import edge_tts
+        return await edge_tts.list_voices(connector=self.connector())
+
+    async def list_voices(self, locale_prefix=None):
+        return [
+            {
+                'id': voice['ShortName'],
+                'name': voice['FriendlyName'],
+                'locale': voice['Locale'],
+                'gender': voice['Gender']
+            }
+            for voice in await self.fetch_voices()
+            if locale_prefix is None or voice['Locale'].startswith(locale_prefix)
+        ]
+
+    async def stream(self, text, voice, rate='+0%', pitch='+0Hz'):
+        import edge_tts
+        communicate = edge_tts.Communicate(text, voice, rate=rate, pitch=pitch, connector=self.connector())
+        async for chunk in communicate.stream():
+            if chunk['type'] == 'audio':
+                yield chunk['data']
+
+
+class EspeakBackend(TTSBackend):
+    """Synthèse hors ligne avec eSpeak NG (ou eSpeak), encodée en MP3 par lame ou ffmpeg.
+
+    Les deux programmes sont reliés par un tube : l'audio est lu au fil de l'encodage.
+    """
+
+    name = 'espeak'
+    label = 'eSpeak (hors ligne)'
+    default_voice = 'fr'
+    capabilities = {'network': False, 'prosody': True, 'format': 'mp3'}
+
+    def __init__(self, command=None, encoder=None):
+        self.command = command or shutil.which('espeak-ng') or shutil.which('espeak')
+        self.encoder = encoder or shutil.which('lame') or shutil.which('ffmpeg')
+        # Un processus par requête : autant que de cœurs
+        self.recommended_concurrency = os.cpu_count() or 2
+
+    def is_available(self):
+        return bool(self.command and self.encoder)
+
+    def synthesizer_args(self, voice, rate, pitch):
+        speed = ESPEAK_DEFAULT_SPEED * (1 + parse_prosody(rate, '%') / 100)
+        # Hauteur eSpeak de 0 à 99 : un hertz Edge vaut ici un cran
+        pitch = ESPEAK_DEFAULT_PITCH + parse_prosody(pitch, 'Hz')
+        return [
+            self.command, '-v', voice or self.default_voice,
+            '-s', str(max(80, int(speed))), '-p', str(min(99, max(0, int(pitch)))),
+            '--stdout'
+        ]
+
+    def identity(self):
+        return f"{self.name}:{os.path.basename(self.command or '')}+{os.path.basename(self.encoder or '')}"
+
+    def encoder_args(self):
+        if os.path.basename(self.encoder).startswith('ffmpeg'):
+            return [self.encoder, '-loglevel', 'error', '-i', 'pipe:0', '-f', 'mp3', 'pipe:1']
+        return [self.encoder, '--quiet', '-', '-']
+
+    async def list_voices(self, locale_prefix=None):
+        process = await asyncio.create_subprocess_exec(
+            self.command, '--voices', stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.DEVNULL
+        )
+        output, _ = await process.communicate()
+        voices = []
+        # Colonnes : Pty Language Age/Gender VoiceName File Other Languages
+        for line in output.decode('utf-8', 'replace').splitlines()[1:]:
+            fields = line.split()
+            if len(fields) < 5:
+                continue
+            language, gender, voice_name = fields[1], fields[2], fields[3]
+            if locale_prefix is None or language.startswith(locale_prefix):
+                voices.append({
+                    'id': language,
+                    'name': f"eSpeak {voice_name.replace('_', ' ')}",
+                    'locale': language,
+                    'gender': {'M': 'Male', 'F': 'Female'}.get(gender[-1:], 'Neutral')
+                })
+        return voices
+
+    async def stream(self, text, voice, rate='+0%', pitch='+0Hz'):
+        synthesizer = encoder = feeder = None
+        read_fd, write_fd = os.pipe()
+        try:
+            try:
+                synthesizer = await asyncio.create_subprocess_exec(
+                    *self.synthesizer_args(voice, rate, pitch),
+                    stdin=asyncio.subprocess.PIPE, stdout=write_fd, stderr=asyncio.subprocess.DEVNULL
+                )
+                encoder = await asyncio.create_subprocess_exec(
+                    *self.encoder_args(),
+                    stdin=read_fd, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.DEVNULL
+                )
+            finally:
+                # Les processus ont hérité du tube : il ne doit pas rester ouvert ici
+                os.close(read_fd)
+                os.close(write_fd)
+
+            async def feed():
+                synthesizer.stdin.write(text.encode('utf-8'))
+                await synthesizer.stdin.drain()
+                synthesizer.stdin.close()
+
+            # Texte envoyé pendant la lecture de l'audio : aucun tube ne peut se remplir
+            feeder = asyncio.ensure_future(feed())
+            while True:
+                block = await encoder.stdout.read(STREAM_BLOCK_SIZE)
+                if not block:
+                    break
+                yield block
+            await feeder
+            if await synthesizer.wait() or await encoder.wait():
+                raise RuntimeError(
+                    f"Échec de {os.path.basename(self.command)} ({synthesizer.returncode}) "
+                    f"ou de {os.path.basename(self.encoder)} ({encoder.returncode})"
+                )
+        finally:
+            # Synthèse annulée (délai dépassé, arrêt) : on ne laisse pas de processus orphelin
+            if feeder and not feeder.done():
+                feeder.cancel()
+            for process in (synthesizer, encoder):
+                if process and process.returncode is None:
+                    process.kill()
+                    await process.wait()
+
+
+class SilenceBackend(TTSBackend):
+    """Moteur hors ligne déterministe : produit du silence MP3 d'une durée
+    proportionnelle au texte et au débit. Sert aux essais et aux mesures sans réseau.
+
+    `latency` simule le temps de réponse d'un service (secondes par requête).
+    """
+
+    name = 'silence'
+    label = 'Silence (test hors ligne)'
+    default_voice = 'silence'
+    recommended_concurrency = 16
+    capabilities = {'network': False, 'prosody': True, 'format': 'mp3'}
+
+    def __init__(self, latency=0.0):
+        self.latency = latency
+
+    async def list_voices(self, locale_prefix=None):
+        return [{'id': self.default_voice, 'name': self.label, 'locale': 'fr-FR', 'gender': 'Neutral'}]
+
+    def frame_count(self, text, rate='+0%'):
+        speed = max(0.1, 1 + parse_prosody(rate, '%') / 100)
+        seconds = len(text) / (SILENCE_CHARS_PER_SECOND * speed)
+        return max(1, int(seconds / SILENT_FRAME_DURATION))
+
+    async def stream(self, text, voice, rate='+0%', pitch='+0Hz'):
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        frames = self.frame_count(text, rate)
+        frames_per_block = STREAM_BLOCK_SIZE // len(SILENT_MP3_FRAME)
+        for start in range(0, frames, frames_per_block):
+            yield SILENT_MP3_FRAME * min(frames_per_block, frames - start)
+
+
+BACKENDS = {backend.name: backend for backend in (EdgeBackend, EspeakBackend, SilenceBackend)}
+
+
+def create_backend(name, byte_budget=None, **options):
+    """Instancie le moteur `name` (voir BACKENDS) avec le ByteBudget partagé
+    `byte_budget` ; ValueError s'il est inconnu."""
+    if name not in BACKENDS:
+        raise ValueError(f"Moteur TTS inconnu : {name}")
+    backend = BACKENDS[name](**options)
+    backend.byte_budget = byte_budget
+    return backend
+
+
+__all__ = [
+    'TTSBackend', 'EdgeBackend', 'EspeakBackend', 'SilenceBackend', 'BACKENDS', 'create_backend',
+    'SILENT_MP3_FRAME'
+]
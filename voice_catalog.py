@@ -0,0 +1,138 @@
+import asyncio
+import json
+import logging
+import os
+import threading
+import time
+from collections import defaultdict
+
+# Durée de validité du catalogue avant rafraîchissement (24 heures)
+DEFAULT_TTL = 24 * 60 * 60
+
+
+class VoiceCatalog:
+    """Catalogue des voix TTS avec index en mémoire et instantané sur disque.
+
+    Les voix sont indexées par ShortName et par locale. L'instantané est relu au
+    démarrage, même périmé, pour que l'application fonctionne hors ligne ; passé
+    `ttl`, il est rafraîchi en arrière-plan sans bloquer les appels.
+    """
+
+    def __init__(self, snapshot_path, fetch_voices, ttl=DEFAULT_TTL, run=None):
+        # fetch_voices() -> coroutine renvoyant la liste des voix (ex. edge_tts.list_voices)
+        self.snapshot_path = str(snapshot_path)
+        self.fetch_voices = fetch_voices
+        # run(coroutine) -> résultat, par ex. AsyncRuntime.run ; sinon boucle dédiée
+        self.run = run
+        self.ttl = ttl
+        self.lock = threading.Lock()
+        self.refresh_thread = None
+        self.voices = []
+        self.by_name = {}
+        self.by_locale = defaultdict(list)
+        self.fetched_at = 0
+        self.load_snapshot()
+
+    def index(self, voices, fetched_at):
+        by_name = {voice['ShortName']: voice for voice in voices}
+        by_locale = defaultdict(list)
+        for voice in voices:
+            by_locale[voice['Locale']].append(voice)
+        with self.lock:
+            self.voices = voices
+            self.by_name = by_name
+            self.by_locale = by_locale
+            self.fetched_at = fetched_at
+
+    def load_snapshot(self):
+        try:
+            with open(self.snapshot_path, 'r', encoding='utf-8') as f:
+                snapshot = json.load(f)
+            self.index(snapshot['voices'], snapshot['fetched_at'])
+            return True
+        except FileNotFoundError:
+            return False
+        except (OSError, ValueError, KeyError) as e:
+            logging.warning(f"Instantané des voix illisible {self.snapshot_path}: {e}")
+            return False
+
+    def save_snapshot(self):
+        os.makedirs(os.path.dirname(self.snapshot_path) or '.', exist_ok=True)
+        temp_path = self.snapshot_path + '.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump({'fetched_at': self.fetched_at, 'voices': self.voices}, f, ensure_ascii=False)
+        os.replace(temp_path, self.snapshot_path)
+
+    def is_expired(self):
+        return time.time() - self.fetched_at > self.ttl
+
+    def refresh(self):
+        """Récupère le catalogue auprès du service et met à jour l'instantané."""
+        if self.run:
+            voices = self.run(self.fetch_voices())
+        else:
+            result = {}
+
+            def fetch():
+                # Boucle dédiée : refresh() peut être appelé depuis une boucle déjà active
+                try:
+                    result['voices'] = asyncio.run(self.fetch_voices())
+                except Exception as e:
+                    result['error'] = e
+
+            thread = threading.Thread(target=fetch, daemon=True)
+            thread.start()
+            thread.join()
+            if 'error' in result:
+                raise result['error']
+            voices = result['voices']
+
+        self.index(voices, time.time())
+        try:
+            self.save_snapshot()
+        except OSError as e:
+            logging.warning(f"Impossible d'enregistrer l'instantané des voix: {e}")
+        return self.voices
+
+    def refresh_in_background(self):
+        """Lance un rafraîchissement en arrière-plan s'il n'y en a pas déjà un."""
+        with self.lock:
+            if self.refresh_thread and self.refresh_thread.is_alive():
+                return
+
+            def run():
+                try:
+                    self.refresh()
+                except Exception as e:
+                    logging.warning(f"Rafraîchissement du catalogue des voix impossible: {e}")
+
+            self.refresh_thread = threading.Thread(target=run, daemon=True)
+            self.refresh_thread.start()
+
+    def ensure_loaded(self):
+        """Garantit un catalogue utilisable : chargement synchrone s'il est vide,
+        rafraîchissement en arrière-plan s'il est périmé."""
+        if not self.voices:
+            self.refresh()
+        elif self.is_expired():
+            self.refresh_in_background()
+
+    def get_voices(self, locale_prefix=None):
+        self.ensure_loaded()
+        if locale_prefix is None:
+            return list(self.voices)
+        return [
+            voice
+            for locale, voices in self.by_locale.items() if locale.startswith(locale_prefix)
+            for voice in voices
+        ]
+
+    def get_voice(self, short_name):
+        return self.by_name.get(short_name)
+
+    def has_voice(self, short_name):
+        self.ensure_loaded()
+        return short_name in self.by_name
+
+
+__all__ = ['VoiceCatalog', 'DEFAULT_TTL']